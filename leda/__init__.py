@@ -2,14 +2,17 @@
 
 # flake8: noqa
 from leda.gen.base import FileReport as FileReport
+from leda.gen.base import FileReportArtifact as FileReportArtifact
 from leda.gen.base import Report as Report
 from leda.gen.base import ReportArtifact as ReportArtifact
 from leda.gen.base import ReportGenerator as ReportGenerator
 from leda.gen.base import ReportModifier as ReportModifier
 from leda.gen.base import ReportPublisher as ReportPublisher
+from leda.gen.base import ReportResult as ReportResult
 from leda.gen.base import ReportRunner as ReportRunner
 from leda.gen.base import ReportSet as ReportSet
 from leda.gen.base import ReportSetRunner as ReportSetRunner
+from leda.gen.cell_cache import CellExecutionCache as CellExecutionCache
 from leda.gen.generators import (
     MainStaticReportGenerator as MainStaticReportGenerator,
 )
@@ -17,6 +20,7 @@ from leda.gen.html_utils import show_input_toggle as show_input_toggle
 from leda.gen.html_utils import (
     show_std_output_toggle as show_std_output_toggle,
 )
+from leda.gen.kernels import KernelPool as KernelPool
 from leda.gen.modifiers import (
     StaticIpywidgetsReportModifier as StaticIpywidgetsReportModifier,
 )
@@ -28,8 +32,27 @@ from leda.gen.publishers import (
     InMemoryReportPublisher as InMemoryReportPublisher,
 )
 from leda.gen.publishers import log_loudly as log_loudly
+from leda.gen.publishers import S3ReportPublisher as S3ReportPublisher
+from leda.gen.runners import CacheOptions as CacheOptions
+from leda.gen.runners import InteractOptions as InteractOptions
 from leda.gen.runners import MainReportRunner as MainReportRunner
+from leda.gen.runners import (
+    ParallelReportSetRunner as ParallelReportSetRunner,
+)
+from leda.gen.runners import PublishOptions as PublishOptions
+from leda.gen.runners import RunnerOptions as RunnerOptions
 from leda.interacting.base import InteractMode as InteractMode
+from leda.interacting.constraints import AllConstraint as AllConstraint
+from leda.interacting.constraints import (
+    AllowedStatesConstraint as AllowedStatesConstraint,
+)
+from leda.interacting.constraints import Constraint as Constraint
+from leda.interacting.constraints import (
+    DependentOptionsConstraint as DependentOptionsConstraint,
+)
+from leda.interacting.constraints import (
+    PredicateConstraint as PredicateConstraint,
+)
 from leda.interacting.core import get_interact_mode as get_interact_mode
 from leda.interacting.core import init as init
 from leda.interacting.core import interact as interact
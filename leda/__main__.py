@@ -3,16 +3,29 @@
 E.g.:
   python -m leda /path/to/notebook.ipynb
   python -m leda /path/to/notebook.ipynb -t $SOME_TAG -i "foo=123;bar='hi'"
+
+  # One report per combination of params:
+  python -m leda /path/to/notebook.ipynb --param foo=1,2 --param bar=a,b
+  # One report per param set in file:
+  python -m leda /path/to/notebook.ipynb --sweep-file params.csv
 """
 
 import argparse
 import datetime
 import logging
 import pathlib
+import sys
+from typing import List
 
 import leda.gen.base
 import leda.gen.runners
+import leda.gen.sidecars
+import leda.gen.sweeps
 import leda.interacting.helpers
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    image_encoders,
+    preflight,
+)
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -20,6 +33,50 @@ logger.addHandler(logging.NullHandler())
 DEFAULT_CELL_TIMEOUT = datetime.timedelta(minutes=10)
 
 
+def run_sweep(
+    args: argparse.Namespace, runner_options: leda.gen.runners.RunnerOptions
+) -> bool:
+    """Generate one report per param set; return whether all succeeded."""
+    file_param_sets = (
+        leda.gen.sweeps.load_param_sets(args.sweep_file)
+        if args.sweep_file is not None
+        else None
+    )
+    param_sets = leda.gen.sweeps.combine_param_sets(
+        file_param_sets, leda.gen.sweeps.parse_param_grid(args.param)
+    )
+
+    reports: List[leda.gen.base.Report] = [
+        leda.gen.base.FileReport(
+            nb_path=args.nb_path,
+            name=args.nb_path.stem,
+            tag=leda.gen.sweeps.get_sweep_tag(params, tag=args.tag),
+            params=params,
+            additional_inject_code=args.inject,
+            cell_timeout=datetime.timedelta(seconds=args.cell_timeout),
+        )
+        for params in param_sets
+    ]
+    for report in reports:
+        # Fail early on unsupported param values.
+        _ = report.inject_code
+
+    runner = leda.gen.runners.ParallelReportSetRunner(
+        args.output_dir,
+        args.static_interact_mode,
+        jobs=args.sweep_jobs,
+        runner_options=runner_options,
+        progress=True,
+    )
+    results = runner.run(leda.gen.base.ReportSet(reports))
+
+    manifest_path = args.manifest or args.output_dir / "manifest.json"
+    leda.gen.sweeps.write_manifest(results, manifest_path)
+    logger.info("Wrote manifest to %s", manifest_path)
+
+    return all(result.ok for result in results)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -79,6 +136,201 @@ def main() -> None:
         choices=[None, "light", "dark"],
         help="nbconvert template theme",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to generate static interact outputs; "
+        "use 0 for all cores",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Release static interact results as soon as they're rendered "
+        "to bound kernel memory (static_ipywidgets only)",
+    )
+    parser.add_argument(
+        "--image-format",
+        default="png",
+        choices=image_encoders.IMAGE_FORMATS,
+        help="Format of static interact images (static_ipywidgets only)",
+    )
+    parser.add_argument(
+        "--image-quality",
+        type=int,
+        default=None,
+        help="Quality of webp (0-100) or jpeg (0-95) images",
+    )
+    parser.add_argument(
+        "--image-optimize",
+        action="store_true",
+        help="Losslessly optimize png images",
+    )
+    parser.add_argument(
+        "--image-colors",
+        type=int,
+        default=None,
+        help="Quantize png images to a palette with this many colors "
+        "(e.g., 64 for line charts)",
+    )
+    parser.add_argument(
+        "--plotly-significant-digits",
+        type=int,
+        default=None,
+        help="Round floats in static interact plotly figures to this many "
+        "significant digits",
+    )
+    parser.add_argument(
+        "--max-interact-states",
+        type=int,
+        default=None,
+        help="Max number of states of each static interact",
+    )
+    parser.add_argument(
+        "--max-interact-secs",
+        type=float,
+        default=None,
+        help="Max estimated time to compute each static interact, "
+        "extrapolated from a sample of its states",
+    )
+    parser.add_argument(
+        "--max-interact-mb",
+        type=float,
+        default=None,
+        help="Max estimated output size of each static interact in MB, "
+        "extrapolated from a sample of its states",
+    )
+    parser.add_argument(
+        "--over-budget",
+        default=preflight.FAIL,
+        choices=preflight.OVER_BUDGET_ACTIONS,
+        help="What to do with static interacts over budget: fail with the "
+        "estimate, only compute the default state, or subsample the values "
+        "of the widgets",
+    )
+    parser.add_argument(
+        "--external-states",
+        action="store_true",
+        help="Write the embedded states of static interacts to JSON files "
+        "in the report dir, which browsers fetch as needed, instead of "
+        "inlining them (panel only; reports must be served over HTTP)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Cache static interact outputs across runs in this dir "
+        "(static_ipywidgets only)",
+    )
+    parser.add_argument(
+        "--cell-cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Cache executed cells across runs in this dir and only execute "
+        "cells from the first changed code cell onward",
+    )
+    parser.add_argument(
+        "--cell-checkpoints",
+        action="store_true",
+        help="Checkpoint the kernel namespace after every cell (requires "
+        "dill in the kernel), so runs can restore it instead of executing "
+        "the unchanged cells",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=None,
+        help="Max size of each cache in MB",
+    )
+    parser.add_argument(
+        "--cache-data-version",
+        type=str,
+        default=None,
+        help="Version of the data used by the notebook (e.g., a date); "
+        "cached outputs are only reused for the same version and "
+        "injected code",
+    )
+    parser.add_argument(
+        "--sweep-file",
+        type=pathlib.Path,
+        default=None,
+        help="Generate one report per param set in this JSON/YAML/CSV file",
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="Generate one report per value, e.g., 'portfolio=abc,def'; "
+        "repeat to generate one report per combination of values",
+    )
+    parser.add_argument(
+        "--sweep-jobs",
+        type=int,
+        default=None,
+        help="Number of reports to generate at once in a sweep; "
+        "defaults to the number of cores",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=pathlib.Path,
+        default=None,
+        help="Path to the JSON summary of a sweep; "
+        "defaults to manifest.json in the output dir",
+    )
+    parser.add_argument(
+        "--s3-url",
+        type=str,
+        default=None,
+        help="Upload reports to this S3 URL, e.g., 's3://bucket/reports', "
+        "instead of only writing them to the output dir (requires boto3)",
+    )
+    parser.add_argument(
+        "--s3-endpoint-url",
+        type=str,
+        default=None,
+        help="Endpoint URL of an S3-compatible store, e.g., MinIO",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="append",
+        default=[],
+        choices=list(leda.gen.sidecars.FORMAT_EXTENSIONS),
+        help="Also write compressed copies of text files (e.g., "
+        "index.html.gz) for static servers; repeat for multiple formats "
+        "(br requires brotli)",
+    )
+    parser.add_argument(
+        "--hash-manifest",
+        action="store_true",
+        help="Also write a manifest.json of content hashes in each report "
+        "dir, e.g., for ETags",
+    )
+    parser.add_argument(
+        "--shared-assets",
+        action="store_true",
+        help="Write the template's CSS and JS once to an assets dir in the "
+        "output dir and link to it instead of inlining it in every report",
+    )
+    parser.add_argument(
+        "--vendored-libraries",
+        action="store_true",
+        help="Load jQuery, require.js, and plotly.js from copies in an "
+        "assets dir in the output dir instead of public CDNs, e.g., for "
+        "viewers without internet access",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write the wall time, CPU time, kernel memory, and output size "
+        "of every cell to profile.json and profile.trace.json (Chrome trace) "
+        "next to each report",
+    )
+    parser.add_argument(
+        "--profile-summary",
+        action="store_true",
+        help="Append a table of the slowest cells to each report",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -88,23 +340,75 @@ def main() -> None:
     # Suppress a log message that seems to have no effect
     logging.getLogger("traitlets").setLevel(logging.ERROR)
 
-    report = leda.gen.base.FileReport(
-        nb_path=args.nb_path,
-        name=args.nb_path.stem,
-        tag=args.tag,
-        additional_inject_code=args.inject,
-        cell_timeout=datetime.timedelta(seconds=args.cell_timeout),
-    )
-    runner = leda.gen.runners.MainReportRunner.get_default_runner(
-        report,
-        args.output_dir,
-        static_interact_mode_alias=args.static_interact_mode,
+    interact_budget = None
+    if (
+        args.max_interact_states is not None
+        or args.max_interact_secs is not None
+        or args.max_interact_mb is not None
+    ):
+        interact_budget = preflight.Budget(
+            max_states=args.max_interact_states,
+            max_secs=args.max_interact_secs,
+            max_mb=args.max_interact_mb,
+            over_budget=args.over_budget,
+        )
+
+    runner_options = leda.gen.runners.RunnerOptions(
         kernel_name=args.kernel,
-        progress=True,
         template_name=args.template_name,
         theme=args.theme,
+        profile=args.profile,
+        profile_summary=args.profile_summary,
+        interact=leda.gen.runners.InteractOptions(
+            jobs=args.jobs,
+            streaming=args.streaming,
+            image_format=args.image_format,
+            image_quality=args.image_quality,
+            image_optimize=args.image_optimize,
+            image_colors=args.image_colors,
+            plotly_significant_digits=args.plotly_significant_digits,
+            budget=interact_budget,
+            external_states=args.external_states,
+        ),
+        cache=leda.gen.runners.CacheOptions(
+            interact_cache_dir=args.cache_dir,
+            cell_cache_dir=args.cell_cache_dir,
+            cell_checkpoints=args.cell_checkpoints,
+            max_bytes=(
+                args.cache_max_mb * 2**20
+                if args.cache_max_mb is not None
+                else None
+            ),
+            data_version=args.cache_data_version,
+        ),
+        publish=leda.gen.runners.PublishOptions(
+            s3_url=args.s3_url,
+            s3_endpoint_url=args.s3_endpoint_url,
+            precompress=tuple(args.precompress),
+            hash_manifest=args.hash_manifest,
+            shared_assets=args.shared_assets,
+            vendored_libraries=args.vendored_libraries,
+        ),
     )
-    runner.run(report=report)
+
+    if args.sweep_file is not None or args.param:
+        if not run_sweep(args, runner_options):
+            sys.exit(1)
+    else:
+        report = leda.gen.base.FileReport(
+            nb_path=args.nb_path,
+            name=args.nb_path.stem,
+            tag=args.tag,
+            additional_inject_code=args.inject,
+            cell_timeout=datetime.timedelta(seconds=args.cell_timeout),
+        )
+        runner = runner_options.get_runner(
+            report,
+            args.output_dir,
+            static_interact_mode_alias=args.static_interact_mode,
+            progress=True,
+        )
+        runner.run(report=report)
 
     logger.info("Done")
 
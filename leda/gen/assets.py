@@ -0,0 +1,94 @@
+"""Shared, content-hashed assets of reports.
+
+nbconvert templates inline their CSS and JS into every report, e.g., the
+lab template's ~250KB of CSS. Instead, inline styles and scripts can be
+written once to a shared dir, named by content, and linked from reports,
+so that browsers and servers cache one copy for all reports.
+
+Note that module scripts are kept inline, since browsers don't load them
+from `file://` URLs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import re
+import tempfile
+
+ASSETS_DIR_NAME = "assets"
+
+# Smaller blocks aren't worth an extra request.
+MIN_ASSET_BYTES = 1024
+
+_HEAD_END = "</head>"
+
+_INLINE_PATTERN = re.compile(
+    r"<(?P<tag>style|script)"
+    r'(?P<attrs>(?: type="(?:text/css|text/javascript)")?)>'
+    r"(?P<content>.*?)</(?P=tag)>",
+    re.DOTALL,
+)
+
+_EXTENSIONS = {"style": ".css", "script": ".js"}
+
+
+def write_asset(
+    content: bytes, extension: str, assets_dir_path: pathlib.Path
+) -> str:
+    """Write asset to dir (unless already there); return its file name."""
+    name = hashlib.sha256(content).hexdigest()[:32] + extension
+    path = assets_dir_path / name
+    if path.exists():
+        return name
+
+    # NB: Reports may be generated concurrently.
+    assets_dir_path.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=assets_dir_path)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return name
+
+
+def get_head_end(html: str) -> int:
+    """Get index of end of head of HTML, or 0 if none."""
+    return max(html.find(_HEAD_END), 0)
+
+
+def externalize_assets(
+    html: str, assets_dir_path: pathlib.Path, assets_url: str
+) -> str:
+    """Move inline styles and scripts of HTML into shared assets.
+
+    Args:
+        html: HTML, e.g., head of report.
+        assets_dir_path: Shared assets dir.
+        assets_url: URL of shared assets dir relative to report, e.g.,
+            "../assets".
+
+    Returns:
+        HTML with links to shared assets.
+    """
+
+    def replace(match: re.Match) -> str:
+        content = match.group("content").encode("utf-8")
+        if len(content) < MIN_ASSET_BYTES:
+            return str(match.group(0))
+
+        tag = match.group("tag")
+        name = write_asset(content, _EXTENSIONS[tag], assets_dir_path)
+        url = f"{assets_url.rstrip('/')}/{name}"
+        if tag == "style":
+            return f'<link rel="stylesheet" type="text/css" href="{url}">'
+        else:
+            return f'<script src="{url}"></script>'
+
+    return _INLINE_PATTERN.sub(replace, html)
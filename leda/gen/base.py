@@ -5,16 +5,22 @@ import dataclasses
 import datetime
 import functools
 import logging
+import os
 import pathlib
-from typing import IO, Any, Mapping
+import shutil
+from typing import IO, Any, Iterator, Mapping
 import uuid
 
 import nbformat
 from typing_extensions import override
 
+from leda.vendor.static_ipywidgets.static_ipywidgets import preflight
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+CHUNK_SIZE = 2**20
+
 
 @dataclasses.dataclass(frozen=True)
 class Report(abc.ABC):
@@ -27,6 +33,8 @@ class Report(abc.ABC):
     additional_inject_code: str | None = None
 
     cell_timeout: datetime.timedelta | None = None
+    # Budget of static interacts; overrides the runner's.
+    interact_budget: preflight.Budget | None = None
 
     @functools.cached_property
     def full_name(self) -> str:
@@ -100,6 +108,91 @@ class ReportArtifact:
         default_factory=dict, hash=False
     )
 
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over body in chunks, e.g., to upload it."""
+        view = memoryview(self.body)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start : start + chunk_size])
+
+    def write_to(self, path: pathlib.Path) -> None:
+        """Write body to file."""
+        path.write_bytes(self.body)
+
+    def cleanup(self) -> None:
+        """Release resources (e.g., temp files) once published."""
+
+
+class FileReportArtifact(ReportArtifact):
+    """Artifact with its body stored in a file instead of in memory.
+
+    Reports with inline images can be hundreds of MB, so generators write
+    them to (temp) files; publishers should use `write_to()` or
+    `iter_chunks()`, which never load the whole body, instead of `body`.
+    """
+
+    path: pathlib.Path
+    temporary: bool
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        images: Mapping[str, bytes] | None = None,
+        temporary: bool = False,
+    ) -> None:
+        """Init.
+
+        Args:
+            path: File with body.
+            images
+            temporary: Whether the file is owned by this artifact, i.e.,
+                can be moved by `write_to()` and deleted by `cleanup()`.
+        """
+        object.__setattr__(self, "path", path)
+        object.__setattr__(self, "images", images if images else {})
+        object.__setattr__(self, "temporary", temporary)
+
+    @override
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(path={self.path!r})"
+
+    @property
+    @override
+    def body(self) -> bytes:
+        return self.path.read_bytes()
+
+    @override
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.path.open("rb") as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    @override
+    def write_to(self, path: pathlib.Path) -> None:
+        if self.temporary:
+            try:
+                os.replace(self.path, path)
+            except OSError:
+                # E.g., on a different file system
+                pass
+            else:
+                object.__setattr__(self, "path", path)
+                object.__setattr__(self, "temporary", False)
+                return
+
+        # NB: This uses, e.g., sendfile() where available.
+        shutil.copyfile(self.path, path)
+
+    @override
+    def cleanup(self) -> None:
+        if self.temporary:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
 
 @dataclasses.dataclass()
 class ReportGenerator(abc.ABC):
@@ -108,6 +201,18 @@ class ReportGenerator(abc.ABC):
         self, nb_contents: nbformat.NotebookNode, html_title: str | None = None
     ) -> bytes: ...
 
+    def generate_artifact(
+        self, nb_contents: nbformat.NotebookNode, html_title: str | None = None
+    ) -> ReportArtifact:
+        """Generate report as an artifact.
+
+        Generators of large reports should override this to return, e.g.,
+        a `FileReportArtifact`.
+        """
+        return ReportArtifact(
+            self.generate(nb_contents, html_title=html_title)
+        )
+
 
 @dataclasses.dataclass()
 class ReportPublisher(abc.ABC):
@@ -123,7 +228,23 @@ class ReportRunner(abc.ABC):
     def run(self, report: Report) -> str | None: ...
 
 
+@dataclasses.dataclass(frozen=True)
+class ReportResult:
+    report: Report
+    duration: datetime.timedelta
+
+    url: str | None = None
+    # Formatted traceback if the report failed.
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 @dataclasses.dataclass()
 class ReportSetRunner(abc.ABC):
     @abc.abstractmethod
-    def run(self, report_set: ReportSet) -> None: ...
+    def run(self, report_set: ReportSet) -> list[ReportResult]:
+        """Run every report, returning results in the same order."""
+        ...
@@ -0,0 +1,242 @@
+"""Persistent cache of executed notebook cells.
+
+Reports are often regenerated after editing only a markdown cell or the
+last chart, so executed code cells are stored on disk across runs, keyed
+by a chain of code cell sources: each cell's key covers its own source
+and the keys of all code cells before it (as well as the data version),
+so a cell is only reused if nothing that ran before it has changed.
+Markdown and raw cells aren't executed, so they aren't part of the chain.
+
+On the next run, the unchanged prefix of the notebook is replayed from
+the cache and only the remaining cells are executed. To execute from the
+middle of a notebook, the kernel state is restored from a checkpoint of
+the kernel namespace (pickled with `dill` inside the kernel) taken after
+the last replayed cell. Without a usable checkpoint, the whole notebook
+is executed again.
+
+Note that checkpoints only include the kernel's *user namespace*: state
+kept elsewhere (e.g., `pd.set_option()`, `plt.rcParams`) is lost on
+restore, except for cells marked to be rerun on restore (see
+`RERUN_ON_RESTORE_KEY`), like leda's own setup cells.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Iterable, Sequence
+
+import nbformat
+
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    cache as result_cache,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_MAX_BYTES = 2**32
+
+# Cells with `metadata["leda"][RERUN_ON_RESTORE_KEY]` set are rerun
+# (silently) after restoring a checkpoint, e.g., to restore module state.
+RERUN_ON_RESTORE_KEY = "rerun_on_restore"
+
+# Substituted for the output dir in cell sources, so that keys don't depend
+# on the (unique) output dir of each run.
+OUTPUT_DIR_PLACEHOLDER = "{leda-output-dir}"
+
+_CHECKPOINT_CODE = """
+def _leda_checkpoint(path):
+    import os
+
+    import dill
+
+    shell = get_ipython()
+    state = {
+        name: value
+        for name, value in shell.user_ns.items()
+        if not name.startswith("_") and name not in shell.user_ns_hidden
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            dill.dump(state, fh)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+try:
+    _leda_checkpoint(%(path)r)
+finally:
+    del _leda_checkpoint
+"""
+
+_RESTORE_CODE = """
+def _leda_restore(path, execution_count):
+    import dill
+
+    shell = get_ipython()
+    with open(path, "rb") as fh:
+        shell.user_ns.update(dill.load(fh))
+    shell.execution_count = execution_count
+
+
+try:
+    _leda_restore(%(path)r, %(execution_count)r)
+finally:
+    del _leda_restore
+"""
+
+
+def is_rerun_on_restore(cell: nbformat.NotebookNode) -> bool:
+    return bool(
+        cell.get("metadata", {}).get("leda", {}).get(RERUN_ON_RESTORE_KEY)
+    )
+
+
+def list_files(dir_path: str | None) -> set[str]:
+    """List files under dir, relative to it."""
+    if dir_path is None:
+        return set()
+
+    rel_paths = set()
+    for dirpath, _, filenames in os.walk(dir_path):
+        for filename in filenames:
+            rel_paths.add(
+                os.path.relpath(os.path.join(dirpath, filename), dir_path)
+            )
+
+    return rel_paths
+
+
+class CellExecutionCache(result_cache.ResultCache):
+    """On-disk cache of executed code cells and kernel checkpoints.
+
+    Files written to the output dir while a cell runs (e.g., static
+    interact images) are stored along with the cell. These are assumed to
+    be content-addressed, as static interact images are.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        data_version: str = "",
+        checkpoints: bool = False,
+    ) -> None:
+        """Init.
+
+        Args:
+            path: Cache dir.
+            max_bytes: Max total size of cells, files, and checkpoints.
+            data_version: Included in every key; change this whenever
+                the data read by the notebook changes.
+            checkpoints: Checkpoint the kernel namespace after every
+                executed code cell, so later runs can execute from the
+                first changed cell instead of from the top. Requires
+                `dill` in the kernel, and can be slow for notebooks with
+                large namespaces.
+        """
+        super().__init__(path, max_bytes=max_bytes, data_version=data_version)
+        self.checkpoints = checkpoints
+
+    def get_cell_keys(
+        self,
+        cells: Sequence[nbformat.NotebookNode],
+        base_key: str = "",
+        output_dir: str | None = None,
+    ) -> list[str | None]:
+        """Get chained keys of code cells (`None` for other cells).
+
+        Args:
+            cells
+            base_key: Key of the run (kernel, etc.).
+            output_dir: Output dir of the run, which is replaced by a
+                placeholder in cell sources.
+        """
+        keys: list[str | None] = []
+        key = base_key
+        for cell in cells:
+            if cell["cell_type"] != "code":
+                keys.append(None)
+                continue
+
+            source = cell["source"]
+            if output_dir:
+                source = source.replace(output_dir, OUTPUT_DIR_PLACEHOLDER)
+            key = self.get_key(key, [source])
+            keys.append(key)
+
+        return keys
+
+    def get_cell(
+        self, key: str, output_dir: str | None = None
+    ) -> dict[str, Any] | None:
+        """Get executed cell (outputs, etc.), or `None` if missing.
+
+        Args:
+            key
+            output_dir: Where to restore the cell's files, if any.
+        """
+        return self.get(key, file_dir=output_dir)  # type: ignore[no-any-return]
+
+    def put_cell(
+        self,
+        key: str,
+        cell: nbformat.NotebookNode,
+        output_dir: str | None = None,
+        file_names: Iterable[str] = (),
+    ) -> None:
+        """Store executed cell.
+
+        Args:
+            key
+            cell
+            output_dir
+            file_names: Files (relative to `output_dir`) written by the
+                cell.
+        """
+        record = {
+            "outputs": cell.get("outputs", []),
+            "execution_count": cell.get("execution_count"),
+        }
+        self.put(key, record, file_dir=output_dir, file_names=file_names)
+
+    def get_checkpoint_path(self, key: str) -> str:
+        return os.path.join(self.path, "checkpoints", key[:2], f"{key}.pkl")
+
+    def has_checkpoint(self, key: str) -> bool:
+        return os.path.exists(self.get_checkpoint_path(key))
+
+    def add_checkpoint(self, key: str) -> None:
+        """Count a checkpoint written by the kernel towards the max size."""
+        try:
+            num_bytes = os.path.getsize(self.get_checkpoint_path(key))
+        except OSError:
+            return
+        self.add_num_bytes(num_bytes)
+
+    def get_checkpoint_code(self, key: str) -> str:
+        """Get code that checkpoints the kernel namespace."""
+        path = self.get_checkpoint_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return _CHECKPOINT_CODE % {"path": path}
+
+    def get_restore_code(self, key: str, execution_count: int) -> str:
+        """Get code that restores the kernel namespace from a checkpoint.
+
+        Args:
+            key
+            execution_count: Execution count to continue from.
+        """
+        path = self.get_checkpoint_path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return _RESTORE_CODE % {
+            "path": path,
+            "execution_count": execution_count,
+        }
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import dataclasses
 import datetime
+import json
 import logging
 import os
 import pathlib
-from typing import Any, cast
+import tempfile
+import threading
+import time
+from typing import Any, Mapping, cast
 
 import jupyter_client.kernelspec
 import nbconvert
@@ -17,16 +21,42 @@ import tqdm
 import traitlets
 from typing_extensions import override
 
+import leda.gen.assets
 import leda.gen.base
+import leda.gen.cell_cache
+import leda.gen.kernels
+import leda.gen.loaders
+import leda.gen.profiles
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# nbconvert<6 runs cells in `preprocess_cell()` and doesn't have the
+# `execute_cell()` hook (or `wait_for_reply()`) of nbclient.
+_HAS_EXECUTE_CELL = packaging.version.parse(nbconvert.__version__).major >= 6
+
+# Exporters are slow to create (e.g., they load and compile templates), so
+# they're shared by all generators in the same thread.
+_EXPORTERS = threading.local()
+
+
+def _get_exporter(**kwargs: str) -> nbconvert.HTMLExporter:
+    exporters: dict[tuple, nbconvert.HTMLExporter] = (
+        _EXPORTERS.__dict__.setdefault("exporters", {})
+    )
+    key = tuple(sorted(kwargs.items()))
+    if key not in exporters:
+        exporters[key] = nbconvert.HTMLExporter(**kwargs)
+
+    return exporters[key]
+
 
 class ExecutePreprocessorWithProgressBar(preprocessors.ExecutePreprocessor):
     """Small extension to provide progress bar."""
 
     progress = traitlets.Bool(default_value=False).tag(config=True)
+    # Record profile of every executed cell; see `leda.gen.profiles`.
+    profile = traitlets.Bool(default_value=False).tag(config=True)
 
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
@@ -34,6 +64,31 @@ class ExecutePreprocessorWithProgressBar(preprocessors.ExecutePreprocessor):
         self._num_cells: int | None = None
         self._pbar: tqdm.tqdm | None = None
 
+        self.cell_profiles: list[leda.gen.profiles.CellProfile] = []
+        self._start_time = time.monotonic()
+
+    def _get_reply(self, msg_id: str) -> dict | None:
+        if _HAS_EXECUTE_CELL:
+            return self.wait_for_reply(msg_id)
+
+        return super()._wait_for_reply(msg_id)
+
+    def _get_kernel_stats(self) -> dict[str, Any]:
+        assert self.kc is not None
+        msg_id = self.kc.execute(
+            "",
+            silent=True,
+            store_history=False,
+            user_expressions={"stats": leda.gen.profiles.STATS_EXPRESSION},
+        )
+        reply = self._get_reply(msg_id)
+        if reply is None or reply["content"]["status"] != "ok":
+            return {}
+
+        return leda.gen.profiles.parse_stats(
+            reply["content"].get("user_expressions", {}).get("stats", {})
+        )
+
     @override
     def preprocess(
         self,
@@ -42,6 +97,8 @@ class ExecutePreprocessorWithProgressBar(preprocessors.ExecutePreprocessor):
         km: jupyter_client.KernelManager | None = None,
     ) -> tuple[nbformat.NotebookNode, dict]:
         self._num_cells = len(nb["cells"])
+        self.cell_profiles = []
+        self._start_time = time.monotonic()
 
         result = super().preprocess(nb, resources, km=km)
         if self._pbar is not None:
@@ -72,11 +129,274 @@ class ExecutePreprocessorWithProgressBar(preprocessors.ExecutePreprocessor):
         self._pbar.set_postfix_str(first_line)
 
         # Note that `preprocess_cell()` will actually run the cell.
-        result = super().preprocess_cell(cell, resources, index)
+        if _HAS_EXECUTE_CELL:
+            result = super().preprocess_cell(cell, resources, index)
+        else:
+            result = (
+                self.execute_cell(cell, index, store_history=store_history),
+                resources,
+            )
         self._pbar.update(1)
 
         return cast("tuple[nbformat.NotebookNode, dict]", result)
 
+    def _execute_cell(
+        self,
+        cell: nbformat.NotebookNode,
+        cell_index: int,
+        execution_count: int | None = None,
+        store_history: bool = True,
+    ) -> nbformat.NotebookNode:
+        """Run cell without any of the `execute_cell()` hooks."""
+        if _HAS_EXECUTE_CELL:
+            return super().execute_cell(
+                cell,
+                cell_index,
+                execution_count=execution_count,
+                store_history=store_history,
+            )
+
+        # NB: Always stores history.
+        cell, _ = super().preprocess_cell(cell, {}, cell_index)
+        return cell
+
+    @override
+    def execute_cell(
+        self,
+        cell: nbformat.NotebookNode,
+        cell_index: int,
+        execution_count: int | None = None,
+        store_history: bool = True,
+    ) -> nbformat.NotebookNode:
+        if not self.profile or cell.cell_type != "code":
+            return self._execute_cell(
+                cell,
+                cell_index,
+                execution_count=execution_count,
+                store_history=store_history,
+            )
+
+        stats_before = self._get_kernel_stats()
+        start_time = time.monotonic()
+        cell = self._execute_cell(
+            cell,
+            cell_index,
+            execution_count=execution_count,
+            store_history=store_history,
+        )
+        end_time = time.monotonic()
+        stats_after = self._get_kernel_stats()
+
+        cpu_secs = None
+        if "cpu_secs" in stats_before and "cpu_secs" in stats_after:
+            cpu_secs = stats_after["cpu_secs"] - stats_before["cpu_secs"]
+        self.cell_profiles.append(
+            leda.gen.profiles.CellProfile(
+                index=cell_index,
+                label=leda.gen.profiles.get_label(cell),
+                start_secs=start_time - self._start_time,
+                wall_secs=end_time - start_time,
+                cpu_secs=cpu_secs,
+                rss_bytes_before=stats_before.get("rss_bytes"),
+                rss_bytes_after=stats_after.get("rss_bytes"),
+                output_bytes=leda.gen.profiles.get_output_bytes(cell),
+                interacts=stats_after.get("interacts", ()),
+            )
+        )
+
+        return cell
+
+
+class CachedExecutePreprocessor(ExecutePreprocessorWithProgressBar):
+    """Replay the unchanged prefix of the notebook from the cell cache.
+
+    See `leda.gen.cell_cache`.
+    """
+
+    def __init__(
+        self,
+        cell_cache: leda.gen.cell_cache.CellExecutionCache,
+        output_dir: str | None = None,
+        base_key: str = "",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.cell_cache = cell_cache
+        self.output_dir = output_dir
+        self.base_key = base_key
+
+        # Set in `preprocess()`.
+        self._keys: list[str | None] = []
+        self._records: dict[int, dict] = {}
+        self._start = 0
+        self._restore_key: str | None = None
+        self._restore_execution_count = 1
+        self._checkpoints = cell_cache.checkpoints
+
+    def _plan(self, cells: list[nbformat.NotebookNode]) -> None:
+        """Find cells to replay and the checkpoint to restore, if any."""
+        self._keys = self.cell_cache.get_cell_keys(
+            cells, base_key=self.base_key, output_dir=self.output_dir
+        )
+        self._records = {}
+        self._start = len(cells)
+        self._restore_key = None
+
+        prev_key = None
+        for index, key in enumerate(self._keys):
+            if key is None:
+                continue
+
+            record = self.cell_cache.get_cell(key)
+            if record is None:
+                self._start = index
+                break
+
+            self._records[index] = record
+            prev_key = key
+
+        if self._start < len(cells) and prev_key is not None:
+            if self._checkpoints and self.cell_cache.has_checkpoint(prev_key):
+                self._restore_key = prev_key
+            else:
+                logger.info("No checkpoint to restore; executing all cells")
+                self._records = {}
+                self._start = 0
+                return
+
+        # Restore files of replayed cells.
+        for index in self._records:
+            key = self._keys[index]
+            assert key is not None
+            if self.cell_cache.get_cell(key, self.output_dir) is None:
+                logger.info("Cached cell evicted; executing all cells")
+                self._records = {}
+                self._start = 0
+                self._restore_key = None
+                return
+
+        execution_counts = [
+            record["execution_count"] for record in self._records.values()
+        ]
+        self._restore_execution_count = (
+            max(filter(None, execution_counts), default=0) + 1
+        )
+
+    def _execute_silently(self, code: str) -> bool:
+        assert self.kc is not None
+        msg_id = self.kc.execute(code, silent=True, store_history=False)
+        reply = self._get_reply(msg_id)
+        if reply is None:
+            return False
+
+        content = reply["content"]
+        if content["status"] != "ok":
+            logger.warning(
+                "Failed to execute silently: %s: %s",
+                content.get("ename"),
+                content.get("evalue"),
+            )
+            return False
+
+        return True
+
+    def _replay_cell(self, cell: nbformat.NotebookNode, index: int) -> None:
+        record = self._records.get(index)
+        if record is not None:
+            cell.outputs = [
+                nbformat.from_dict(output) for output in record["outputs"]
+            ]
+            cell.execution_count = record["execution_count"]
+
+        if self._restore_key is not None and (
+            leda.gen.cell_cache.is_rerun_on_restore(cell)
+        ):
+            if not self._execute_silently(cell.source):
+                raise RuntimeError(
+                    f"Failed to rerun cell {index} after restoring checkpoint"
+                )
+
+    @override
+    def preprocess(
+        self,
+        nb: nbformat.NotebookNode,
+        resources: dict | None = None,
+        km: jupyter_client.KernelManager | None = None,
+    ) -> tuple[nbformat.NotebookNode, dict]:
+        self._plan(nb["cells"])
+
+        if self._start == len(nb["cells"]):
+            logger.info("Replaying all cells from cache")
+            for index, cell in enumerate(nb["cells"]):
+                self._replay_cell(cell, index)
+            return nb, resources if resources is not None else {}
+
+        if self._start:
+            logger.info(
+                "Replaying %s cells from cache; executing %s cells",
+                self._start,
+                len(nb["cells"]) - self._start,
+            )
+
+        return super().preprocess(nb, resources, km=km)
+
+    @override
+    def execute_cell(
+        self,
+        cell: nbformat.NotebookNode,
+        cell_index: int,
+        execution_count: int | None = None,
+        store_history: bool = True,
+    ) -> nbformat.NotebookNode:
+        if cell_index == 0 and self._restore_key is not None:
+            restore_code = self.cell_cache.get_restore_code(
+                self._restore_key, self._restore_execution_count
+            )
+            if not self._execute_silently(restore_code):
+                logger.warning("Failed to restore checkpoint")
+                self._records = {}
+                self._start = 0
+                self._restore_key = None
+
+        if cell_index < self._start:
+            self._replay_cell(cell, cell_index)
+            return cell
+
+        key = self._keys[cell_index]
+        if key is not None:
+            file_names_before = leda.gen.cell_cache.list_files(self.output_dir)
+
+        cell = super().execute_cell(
+            cell,
+            cell_index,
+            execution_count=execution_count,
+            store_history=store_history,
+        )
+        if key is None:
+            return cell
+
+        file_names = (
+            leda.gen.cell_cache.list_files(self.output_dir) - file_names_before
+        )
+        self.cell_cache.put_cell(
+            key,
+            cell,
+            output_dir=self.output_dir,
+            file_names=sorted(file_names),
+        )
+        if self._checkpoints:
+            if self._execute_silently(
+                self.cell_cache.get_checkpoint_code(key)
+            ):
+                self.cell_cache.add_checkpoint(key)
+            else:
+                logger.warning(
+                    "Failed to checkpoint kernel; no more checkpoints"
+                )
+                self._checkpoints = False
+
+        return cell
+
 
 @dataclasses.dataclass()
 class MainStaticReportGenerator(leda.gen.base.ReportGenerator):
@@ -87,6 +407,29 @@ class MainStaticReportGenerator(leda.gen.base.ReportGenerator):
     template_name: str | None = None
     theme: str | None = None
 
+    # If set, replay unchanged cells from previous runs; see
+    # `leda.gen.cell_cache`.
+    cell_cache: leda.gen.cell_cache.CellExecutionCache | None = None
+    # Dir the report's files (e.g., static interact images) are written to,
+    # so they can be cached along with the cells that wrote them.
+    output_dir_path: pathlib.Path | None = None
+    # If set, borrow pre-warmed kernels from this pool instead of starting
+    # a new kernel for every report.
+    kernel_pool: leda.gen.kernels.KernelPool | None = None
+    # If set, write the template's inline CSS and JS to this shared dir,
+    # named by content, and link to them; see `leda.gen.assets`.
+    shared_assets_dir_path: pathlib.Path | None = None
+    # URL of the shared assets dir, relative to the report.
+    shared_assets_url: str = "../" + leda.gen.assets.ASSETS_DIR_NAME
+    # Library name -> URL of libraries loaded by the template, e.g.,
+    # vendored copies; see `leda.gen.loaders`.
+    library_urls: Mapping[str, str] | None = None
+    # Write profile of every executed cell next to the report (in
+    # `output_dir_path`), and optionally append a summary to the report;
+    # see `leda.gen.profiles`.
+    profile: bool = False
+    profile_summary: bool = False
+
     def __post_init__(self) -> None:
         nbconvert_version = packaging.version.parse(nbconvert.__version__)
         is_classic = self.template_name == "classic" or (
@@ -102,7 +445,7 @@ class MainStaticReportGenerator(leda.gen.base.ReportGenerator):
 
     def _get_preprocessor(
         self,
-    ) -> preprocessors.ExecutePreprocessor:
+    ) -> ExecutePreprocessorWithProgressBar:
         kwargs: dict[str, Any] = {}
 
         if self.cell_timeout:
@@ -118,8 +461,22 @@ class MainStaticReportGenerator(leda.gen.base.ReportGenerator):
                     f"Kernel choices: {kernel_specs.keys()}"
                 )
 
+        if self.cell_cache is not None:
+            return CachedExecutePreprocessor(
+                self.cell_cache,
+                output_dir=(
+                    str(self.output_dir_path) if self.output_dir_path else None
+                ),
+                base_key=json.dumps([self.kernel_name or ""]),
+                progress=self.progress,
+                profile=self.profile or self.profile_summary,
+                **kwargs,
+            )
+
         return ExecutePreprocessorWithProgressBar(
-            progress=self.progress, **kwargs
+            progress=self.progress,
+            profile=self.profile or self.profile_summary,
+            **kwargs,
         )
 
     def _get_exporter_kwargs(self) -> dict:
@@ -136,29 +493,119 @@ class MainStaticReportGenerator(leda.gen.base.ReportGenerator):
         if self.theme:
             exporter_kwargs["theme"] = self.theme
 
+        # NB: Older versions of nbconvert don't have these.
+        library_urls = self.library_urls or {}
+        for trait_name, library_name in [
+            ("require_js_url", leda.gen.loaders.REQUIREJS),
+            ("jquery_url", leda.gen.loaders.JQUERY),
+        ]:
+            if (
+                library_name in library_urls
+                and trait_name in nbconvert.HTMLExporter.class_trait_names()
+            ):
+                exporter_kwargs[trait_name] = library_urls[library_name]
+
         return exporter_kwargs
 
+    def _execute(
+        self, nb_contents: nbformat.NotebookNode
+    ) -> list[leda.gen.profiles.CellProfile]:
+        """Execute notebook in place; return profiles of executed cells."""
+        preprocessor = self._get_preprocessor()
+        resources = {"metadata": {"path": os.getcwd()}}
+        if self.kernel_pool is not None:
+            kernel_name = self.kernel_name or nb_contents.get(
+                "metadata", {}
+            ).get("kernelspec", {}).get("name")
+            with self.kernel_pool.kernel(kernel_name) as km:
+                try:
+                    preprocessor.preprocess(
+                        nb_contents, resources=resources, km=km
+                    )
+                finally:
+                    # The preprocessor only cleans up its client if it
+                    # started the kernel itself.
+                    if preprocessor.kc is not None:
+                        preprocessor.kc.stop_channels()
+        else:
+            preprocessor.preprocess(nb_contents, resources=resources)
+        if self.cell_cache is not None:
+            self.cell_cache.prune()
+
+        return preprocessor.cell_profiles
+
     @override
     def generate(
         self,
         nb_contents: nbformat.NotebookNode,
         html_title: str | None = None,
     ) -> bytes:
+        artifact = self.generate_artifact(nb_contents, html_title=html_title)
+        try:
+            return artifact.body
+        finally:
+            artifact.cleanup()
+
+    @override
+    def generate_artifact(
+        self,
+        nb_contents: nbformat.NotebookNode,
+        html_title: str | None = None,
+    ) -> leda.gen.base.FileReportArtifact:
         logger.info("Generating notebook")
-        preprocessor = self._get_preprocessor()
-        preprocessor.preprocess(
-            nb_contents, resources={"metadata": {"path": os.getcwd()}}
-        )
+        profiles = self._execute(nb_contents)
+        if self.profile:
+            if self.output_dir_path is not None:
+                leda.gen.profiles.write_profiles(
+                    profiles, self.output_dir_path
+                )
+            else:
+                logger.warning("No output dir to write profile to")
+        if self.profile_summary and profiles:
+            nb_contents.cells.append(
+                leda.gen.profiles.get_summary_cell(profiles)
+            )
 
         logger.info("Generating HTML")
-        exporter = nbconvert.HTMLExporter(**self._get_exporter_kwargs())
+        exporter = _get_exporter(**self._get_exporter_kwargs())
+        # NB: Templates use this as the page title.
+        resources = {"metadata": {"name": html_title}} if html_title else None
         body: str
-        body, _ = exporter.from_notebook_node(nb_contents)
-
-        logger.info("Modifying HTML")
-        if html_title:
-            body = body.replace(
-                "<title>Notebook</title>", f"<title>{html_title}</title>"
-            )
-
-        return body.encode(errors="ignore")
+        body, _ = exporter.from_notebook_node(nb_contents, resources=resources)
+
+        # Write next to the published report if possible, so that it can be
+        # moved there instead of copied.
+        tmp_dir = (
+            self.output_dir_path
+            if self.output_dir_path and self.output_dir_path.is_dir()
+            else None
+        )
+        fd, tmp_path = tempfile.mkstemp(suffix=".html", dir=tmp_dir)
+        try:
+            # Temp files are only readable by the owner by default.
+            os.chmod(tmp_path, 0o644)
+            with open(fd, "w", encoding="utf-8", errors="ignore") as fh:
+                body_start = 0
+                if self.shared_assets_dir_path is not None:
+                    # Templates only inline assets in the head.
+                    body_start = leda.gen.assets.get_head_end(body)
+                    fh.write(
+                        leda.gen.assets.externalize_assets(
+                            body[:body_start],
+                            self.shared_assets_dir_path,
+                            self.shared_assets_url,
+                        )
+                    )
+
+                # Encode in chunks instead of copying the whole body.
+                for start in range(
+                    body_start, len(body), leda.gen.base.CHUNK_SIZE
+                ):
+                    fh.write(body[start : start + leda.gen.base.CHUNK_SIZE])
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return leda.gen.base.FileReportArtifact(
+            pathlib.Path(tmp_path), temporary=True
+        )
@@ -4,6 +4,8 @@ from typing import List, Tuple, Union
 
 import IPython.display
 
+import leda.gen.loaders
+
 Selector = Union[str, Tuple[str, str]]
 Selectors = List[Selector]
 
@@ -84,13 +86,19 @@ def show_toggle(
         ]
     )
 
-    # Load jQuery, since it's only automatically loaded in "classic" template.
-    return IPython.display.HTML(
-        f"""
+    # Load jQuery, since it's only automatically loaded in "classic" template,
+    # unless it's already loaded on the page (see `leda.gen.loaders`).
+    jquery_html = ""
+    if not leda.gen.loaders.is_library_on_page(leda.gen.loaders.JQUERY):
+        jquery_url = leda.gen.loaders.get_library_url(leda.gen.loaders.JQUERY)
+        jquery_html = f"""
 <script
-  src="https://cdnjs.cloudflare.com/ajax/libs/jquery/2.0.3/jquery.min.js">
+  src="{jquery_url}">
 </script>
+"""
 
+    return IPython.display.HTML(
+        f"""{jquery_html}
 <script>
     show_{name} = true;
     function toggle_{name}() {{
@@ -0,0 +1,315 @@
+"""Pool of pre-warmed kernels, reused across report generations.
+
+Starting a kernel and importing numpy, pandas, matplotlib, etc. in it
+can take longer than executing a small report. A pool keeps idle kernels
+around with those modules already imported, and hands them out to
+`MainStaticReportGenerator` (see its `kernel_pool` field).
+
+Between reports, a kernel's user namespace is reset (and figures are
+closed). Note that other state, e.g., `pd.set_option()`, carries over
+from one report to the next; set `max_uses=1` for reports that can't
+tolerate that. Kernels are restarted after `max_uses` reports, when their
+memory grows beyond `max_memory_bytes`, or after a failed report.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import dataclasses
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Iterator, Sequence
+
+import jupyter_client
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_PRELOAD_MODULES = (
+    "numpy",
+    "pandas",
+    "matplotlib.pyplot",
+    "plotly.graph_objects",
+    "leda",
+)
+
+DEFAULT_KERNEL_NAME = "python3"
+
+_PRELOAD_CODE = """
+def _leda_preload(module_names):
+    import importlib
+
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+
+try:
+    _leda_preload(%(module_names)r)
+finally:
+    del _leda_preload
+"""
+
+_RESET_CODE = """
+import sys as _leda_sys
+
+if "matplotlib.pyplot" in _leda_sys.modules:
+    _leda_sys.modules["matplotlib.pyplot"].close("all")
+del _leda_sys
+
+get_ipython().reset(new_session=True)
+
+import gc as _leda_gc
+import os as _leda_os
+
+_leda_gc.collect()
+_leda_os.chdir(%(cwd)r)
+del _leda_gc, _leda_os
+"""
+
+_RSS_EXPRESSION = "__import__('leda.gen.kernels').gen.kernels.get_rss_bytes()"
+
+
+def get_rss_bytes() -> int | None:
+    """Get resident memory of the current process, if available."""
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return int(psutil.Process().memory_info().rss)
+
+    try:
+        with open("/proc/self/statm") as fh:
+            num_pages = int(fh.read().split()[1])
+        return num_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@dataclasses.dataclass()
+class _PooledKernel:
+    km: jupyter_client.KernelManager
+    num_uses: int = 0
+
+
+class KernelPool:
+    """Pool of pre-warmed kernels per kernelspec.
+
+    Not shared across processes; every process should have its own pool.
+
+    E.g.:
+
+        with KernelPool(size=2) as kernel_pool:
+            generator = MainStaticReportGenerator(kernel_pool=kernel_pool)
+            for nb_contents in nbs:
+                generator.generate(nb_contents)
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        preload_modules: Sequence[str] = DEFAULT_PRELOAD_MODULES,
+        max_uses: int | None = None,
+        max_memory_bytes: int | None = None,
+        timeout: float = 60,
+    ) -> None:
+        """Init.
+
+        Args:
+            size: Max number of idle kernels per kernelspec.
+            preload_modules: Modules to import in new kernels; modules
+                that aren't installed are skipped.
+            max_uses: Restart kernels after this many reports.
+            max_memory_bytes: Restart kernels once their resident memory
+                (after a reset) exceeds this.
+            timeout: Timeout in secs for starting, warming, and resetting
+                kernels.
+        """
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}")
+        if max_uses is not None and max_uses < 1:
+            raise ValueError(f"Invalid max uses: {max_uses}")
+
+        self.size = size
+        self.preload_modules = list(preload_modules)
+        self.max_uses = max_uses
+        self.max_memory_bytes = max_memory_bytes
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._idle: dict[str, collections.deque[_PooledKernel]] = (
+            collections.defaultdict(collections.deque)
+        )
+        self._closed = False
+
+    def _execute(
+        self,
+        km: jupyter_client.KernelManager,
+        code: str,
+        user_expressions: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        kc = km.client()
+        kc.start_channels()
+        try:
+            kc.wait_for_ready(timeout=self.timeout)
+            msg_id = kc.execute(
+                code,
+                silent=True,
+                store_history=False,
+                user_expressions=user_expressions,
+            )
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    reply = kc.get_shell_msg(
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except queue.Empty:
+                    raise TimeoutError("Kernel didn't reply") from None
+                if reply["parent_header"].get("msg_id") == msg_id:
+                    break
+        finally:
+            kc.stop_channels()
+
+        content: dict[str, Any] = reply["content"]
+        if content["status"] != "ok":
+            raise RuntimeError(
+                f"Failed to execute in kernel: "
+                f"{content.get('ename')}: {content.get('evalue')}"
+            )
+
+        return content
+
+    def _start(self, kernel_name: str) -> _PooledKernel:
+        logger.info("Starting %r kernel", kernel_name)
+        km = jupyter_client.KernelManager(kernel_name=kernel_name)
+        km.start_kernel(cwd=os.getcwd())
+        try:
+            if self.preload_modules:
+                self._execute(
+                    km, _PRELOAD_CODE % {"module_names": self.preload_modules}
+                )
+        except BaseException:
+            km.shutdown_kernel(now=True)
+            raise
+
+        return _PooledKernel(km)
+
+    def _shutdown(self, kernel: _PooledKernel) -> None:
+        try:
+            kernel.km.shutdown_kernel(now=True)
+        except Exception:
+            logger.exception("Failed to shut down kernel")
+
+    def _recycle(self, kernel: _PooledKernel, cwd: str) -> bool:
+        """Reset kernel for the next report, or return false to restart."""
+        if not kernel.km.is_alive():
+            logger.info("Kernel died")
+            return False
+
+        if self.max_uses is not None and kernel.num_uses >= self.max_uses:
+            logger.info("Kernel used %s times", kernel.num_uses)
+            return False
+
+        try:
+            content = self._execute(
+                kernel.km,
+                _RESET_CODE % {"cwd": cwd},
+                user_expressions={"rss": _RSS_EXPRESSION},
+            )
+        except (RuntimeError, TimeoutError):
+            logger.exception("Failed to reset kernel")
+            return False
+
+        if self.max_memory_bytes is not None:
+            rss_result = content.get("user_expressions", {}).get("rss", {})
+            try:
+                rss = int(rss_result["data"]["text/plain"])
+            except (KeyError, ValueError):
+                # E.g., None if not available
+                rss = None
+            if rss is not None and rss > self.max_memory_bytes:
+                logger.info("Kernel using %s bytes", rss)
+                return False
+
+        return True
+
+    def warm(self, kernel_name: str | None = None) -> None:
+        """Start kernels until there are `size` idle kernels."""
+        kernel_name = kernel_name or DEFAULT_KERNEL_NAME
+        while True:
+            with self._lock:
+                if len(self._idle[kernel_name]) >= self.size:
+                    return
+
+            kernel = self._start(kernel_name)
+            with self._lock:
+                self._idle[kernel_name].append(kernel)
+
+    @contextlib.contextmanager
+    def kernel(
+        self, kernel_name: str | None = None
+    ) -> Iterator[jupyter_client.KernelManager]:
+        """Borrow a kernel.
+
+        Args:
+            kernel_name: Kernelspec name; defaults to python3.
+
+        Returns:
+            Context manager that yields the manager of a started kernel,
+            to be passed to, e.g., `ExecutePreprocessor.preprocess()`.
+        """
+        if self._closed:
+            raise RuntimeError("Kernel pool is closed")
+
+        kernel_name = kernel_name or DEFAULT_KERNEL_NAME
+        with self._lock:
+            idle = self._idle[kernel_name]
+            kernel = idle.popleft() if idle else None
+        if kernel is None:
+            kernel = self._start(kernel_name)
+
+        cwd = os.getcwd()
+        kernel.num_uses += 1
+        try:
+            yield kernel.km
+        except BaseException:
+            # Kernel may be in any state, e.g., after a timeout.
+            self._shutdown(kernel)
+            raise
+
+        if not self._recycle(kernel, cwd):
+            self._shutdown(kernel)
+            kernel = self._start(kernel_name)
+
+        with self._lock:
+            if not self._closed and len(idle) < self.size:
+                idle.append(kernel)
+                kernel = None
+        if kernel is not None:
+            self._shutdown(kernel)
+
+    def close(self) -> None:
+        """Shut down all idle kernels."""
+        with self._lock:
+            self._closed = True
+            kernels = [
+                kernel for idle in self._idle.values() for kernel in idle
+            ]
+            self._idle.clear()
+
+        for kernel in kernels:
+            self._shutdown(kernel)
+
+    def __enter__(self) -> KernelPool:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,123 @@
+"""Page-level loaders of the JS libraries used by reports.
+
+Toggles (see `leda.gen.html_utils`) need jQuery and plotly figures need
+require.js to be configured to load plotly.js. Instead of every toggle and
+every figure (state) loading them, `show_library_loaders()` is displayed
+once at the top of a report, and later outputs assume the libraries are
+on the page.
+
+Libraries are loaded from public CDNs by default, or from vendored copies
+(see `write_vendored_libraries()`), e.g., for viewers without internet
+access.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Mapping
+
+import IPython.display
+
+import leda.gen.assets
+
+JQUERY = "jquery"
+REQUIREJS = "requirejs"
+PLOTLY = "plotly"
+
+CDN_URLS = {
+    JQUERY: "https://cdnjs.cloudflare.com/ajax/libs/jquery/2.0.3/jquery.min.js",
+    REQUIREJS: (
+        "https://cdnjs.cloudflare.com/ajax/libs/require.js/2.1.10/"
+        "require.min.js"
+    ),
+    PLOTLY: "https://cdn.plot.ly/plotly-latest.min.js",
+}
+
+VENDOR_DIR_PATH = pathlib.Path(__file__).parent.parent / "vendor" / "js"
+
+_VENDORED_FILE_NAMES = {
+    JQUERY: "jquery.min.js",
+    REQUIREJS: "require.js",
+}
+
+# URLs of libraries loaded by `show_library_loaders()` on the current page.
+_PAGE_LIBRARY_URLS: dict[str, str] = {}
+
+
+def get_library_url(name: str) -> str:
+    return _PAGE_LIBRARY_URLS.get(name, CDN_URLS[name])
+
+
+def is_library_on_page(name: str) -> bool:
+    return name in _PAGE_LIBRARY_URLS
+
+
+def _read_vendored_library(name: str) -> bytes:
+    if name == PLOTLY:
+        import plotly.offline
+
+        return str(plotly.offline.get_plotlyjs()).encode("utf-8")
+
+    return (VENDOR_DIR_PATH / _VENDORED_FILE_NAMES[name]).read_bytes()
+
+
+def write_vendored_libraries(
+    assets_dir_path: pathlib.Path, assets_url: str
+) -> dict[str, str]:
+    """Write vendored libraries to shared assets dir.
+
+    plotly.js is the version bundled with the installed plotly package.
+
+    Args:
+        assets_dir_path: Shared assets dir (see `leda.gen.assets`).
+        assets_url: URL of shared assets dir relative to reports.
+
+    Returns:
+        Library name -> URL.
+    """
+    library_urls = {}
+    for name in CDN_URLS:
+        file_name = leda.gen.assets.write_asset(
+            _read_vendored_library(name), ".js", assets_dir_path
+        )
+        library_urls[name] = f"{assets_url.rstrip('/')}/{file_name}"
+
+    return library_urls
+
+
+def show_library_loaders(
+    library_urls: Mapping[str, str] | None = None,
+) -> IPython.display.HTML:
+    """Show loaders of libraries, once per page.
+
+    Args:
+        library_urls: Library name -> URL, e.g., of vendored copies;
+            defaults to CDN URLs.
+
+    Returns:
+        Loaders in HTML.
+    """
+    _PAGE_LIBRARY_URLS.clear()
+    _PAGE_LIBRARY_URLS.update(CDN_URLS)
+    _PAGE_LIBRARY_URLS.update(library_urls or {})
+
+    # NB: require.js appends ".js" to paths. Newer plotly.js bundles don't
+    # define an AMD module, but set `window.Plotly` (the shim is ignored for
+    # bundles that do).
+    plotly_path, _ = os.path.splitext(_PAGE_LIBRARY_URLS[PLOTLY])
+    return IPython.display.HTML(
+        f"""
+<script src="{_PAGE_LIBRARY_URLS[JQUERY]}"></script>
+
+<script type="text/javascript">
+    if (window.requirejs) {{
+        requirejs.config({{
+            paths: {{plotly: [{json.dumps(plotly_path)}]}},
+            shim: {{plotly: {{exports: "Plotly"}}}},
+        }});
+    }}
+</script>
+"""
+    )
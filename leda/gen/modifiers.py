@@ -1,20 +1,38 @@
 from __future__ import annotations
 
 import dataclasses
+import json
 import logging
 import pathlib
-from typing import ClassVar
+from typing import ClassVar, Mapping
 
 import nbformat
 from typing_extensions import override
 
 import leda.gen.base
+import leda.gen.cell_cache
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    cache as result_cache,
+)
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    image_encoders,
+    preflight,
+)
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 TOC_LEVELS = ["I", "A", "1", "a", "i"]
 
+# Dir of external panel states in the output dir of a report.
+STATES_DIR_NAME = "states"
+
+# Setup cells only change module state (e.g., the interact mode), which
+# isn't part of kernel checkpoints, so rerun them after a restore.
+SETUP_CELL_METADATA = {
+    "leda": {leda.gen.cell_cache.RERUN_ON_RESTORE_KEY: True}
+}
+
 
 def insert_toc(cells: list[nbformat.NotebookNode]) -> None:  # noqa: C901
     """Inserts table of contents in-place."""
@@ -82,6 +100,9 @@ class StaticReportModifier(leda.gen.base.ReportModifier):
     static_interact_mode_cls_name: ClassVar[str]
 
     inject_code: str | None = None
+    # Library name -> URL of libraries loaded once at the top of the
+    # report, e.g., vendored copies; see `leda.gen.loaders`.
+    library_urls: Mapping[str, str] | None = None
 
     def _check_nb(self, nb_contents: nbformat.NotebookNode) -> None:
         nb_version = nb_contents["nbformat"]
@@ -97,9 +118,12 @@ class StaticReportModifier(leda.gen.base.ReportModifier):
                 f"""
 # Auto-generated by leda
 import leda
+import leda.gen.loaders
 
 
-leda.set_interact_mode(leda.{self.static_interact_mode_cls_name}())"""
+leda.set_interact_mode(leda.{self.static_interact_mode_cls_name}())
+leda.gen.loaders.show_library_loaders({dict(self.library_urls or {})!r})""",
+                metadata=SETUP_CELL_METADATA,
             ),
         ]
 
@@ -171,6 +195,62 @@ class StaticPanelReportModifier(StaticReportModifier):
     static_interact_mode_cls_name: ClassVar[str] = "StaticPanelInteractMode"
 
     inject_code: str | None = None
+    # If set, write the embedded states of interacts as JSON files under
+    # this dir (e.g., in the report's output dir), which the browser
+    # fetches as needed, instead of inlining them in the report.
+    state_dir_path: pathlib.Path | None = None
+    # URL of the state dir relative to the report.
+    state_url: str = STATES_DIR_NAME
+    # If set, estimate the cost of the embedded states of every interact
+    # from a sample of states, and enforce this budget.
+    interact_budget: preflight.Budget | None = None
+    # Number of worker processes used to precompute the embedded states;
+    # set to 0 to use all cores.
+    jobs: int | None = None
+
+    @override
+    def _get_new_cells_top(self) -> list[nbformat.NotebookNode]:
+        new_cells = super()._get_new_cells_top()
+
+        # NB: Set every option, even if it's the default, since the kernel
+        # may have been used for another report before (see `KernelPool`).
+        executor_str = (
+            "static_executors.ForkProcessExecutor(\n"
+            f"    jobs={self.jobs!r},\n)"
+            if self.jobs is not None and self.jobs != 1
+            else "None"
+        )
+        state_dir = (
+            str(self.state_dir_path)
+            if self.state_dir_path is not None
+            else None
+        )
+        budget_str = (
+            "static_preflight.Budget(\n"
+            f"    **{dataclasses.asdict(self.interact_budget)!r}\n)"
+            if self.interact_budget is not None
+            else "None"
+        )
+        new_cells.append(
+            nbformat.v4.new_code_cell(
+                f"""
+# Auto-generated by leda
+import leda.interacting.panel
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import executors as static_executors
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import preflight as static_preflight
+
+leda.interacting.panel.EXECUTOR = {executor_str}
+leda.interacting.panel.STATE_DIR = {state_dir!r}
+leda.interacting.panel.STATE_URL = {self.state_url!r}
+leda.interacting.panel.BUDGET = {budget_str}
+""",
+                metadata=SETUP_CELL_METADATA,
+            )
+        )
+
+        return new_cells
 
 
 @dataclasses.dataclass()
@@ -187,7 +267,38 @@ class StaticIpywidgetsReportModifier(
         "StaticIpywidgetsInteractMode"
     )
 
+    # Number of worker processes used to generate static interact outputs;
+    # set to 0 to use all cores.
+    jobs: int | None = None
+    # Release each static interact result as soon as it's rendered and
+    # spill rendered outputs to disk, to bound kernel memory.
+    streaming: bool = False
+    # Image encoding options; see `image_encoders.get_image_encoder()`.
+    image_format: str = "png"
+    image_quality: int | None = None
+    image_optimize: bool = False
+    image_colors: int | None = None
+    # Round floats in plotly figures to this many significant digits.
+    plotly_significant_digits: int | None = None
+    # If set, cache rendered static interact states across runs here;
+    # see `cache.ResultCache`. The data version (along with the injected
+    # code) should change whenever the data used by interacts changes.
+    cache_dir: pathlib.Path | None = None
+    cache_max_bytes: int | None = None
+    cache_data_version: str | None = None
+    # If set, estimate the cost of every static interact from a sample of
+    # states before computing all of them, and enforce this budget.
+    interact_budget: preflight.Budget | None = None
+
     def __post_init__(self) -> None:
+        # Fail early on invalid options.
+        image_encoders.get_image_encoder(
+            self.image_format,
+            quality=self.image_quality,
+            optimize=self.image_optimize,
+            colors=self.image_colors,
+        )
+
         if self.local_dir_path:
             local_img_dir_path = self.local_dir_path / "images"
             local_img_dir_path.mkdir(parents=True, exist_ok=True)
@@ -196,16 +307,99 @@ class StaticIpywidgetsReportModifier(
     def _get_new_cells_top(self) -> list[nbformat.NotebookNode]:
         new_cells = super()._get_new_cells_top()
 
+        if (
+            self.image_format != "png"
+            or self.image_quality is not None
+            or self.image_optimize
+            or self.image_colors is not None
+        ):
+            encoder_str = f"""
+    encoder=static_image_encoders.get_image_encoder(
+        {self.image_format!r},
+        quality={self.image_quality!r},
+        optimize={self.image_optimize!r},
+        colors={self.image_colors!r},
+    ),"""
+        else:
+            encoder_str = ""
+
         if self.local_dir_path:
             set_image_manager_str = f"""
 static_interact.IMAGE_MANAGER = static_interact.FileImageManager(
-    path=os.path.join({str(self.local_dir_path)!r}, "images"),
+    path=os.path.join({str(self.local_dir_path)!r}, "images"),{encoder_str}
 )
 """
         else:
-            set_image_manager_str = """
-static_interact.IMAGE_MANAGER = static_interact.InlineImageManager()
-"""
+            set_image_manager_str = (
+                "\nstatic_interact.IMAGE_MANAGER = "
+                f"static_interact.InlineImageManager({encoder_str}\n)\n"
+            )
+
+        # NB: Set every option, even if it's the default, since the kernel
+        # may have been used for another report before (see `KernelPool`).
+        set_option_strs = [set_image_manager_str]
+        if self.jobs is not None and self.jobs != 1:
+            set_option_strs.append(f"""
+static_interact.EXECUTOR = static_executors.ForkProcessExecutor(
+    jobs={self.jobs!r},
+)
+""")
+        else:
+            set_option_strs.append("""
+static_interact.EXECUTOR = None
+""")
+        set_option_strs.append(f"""
+static_interact.PLOTLY_SIGNIFICANT_DIGITS = {self.plotly_significant_digits!r}
+static_interact.SHARE_PLOTLY_STRUCTURE = True
+""")
+        if self.cache_dir is not None:
+            data_version = json.dumps(
+                [self.cache_data_version or "", self.inject_code or ""]
+            )
+            max_bytes = (
+                self.cache_max_bytes
+                if self.cache_max_bytes is not None
+                else result_cache.DEFAULT_MAX_BYTES
+            )
+            set_option_strs.append(f"""
+static_interact.CACHE = static_cache.ResultCache(
+    {str(self.cache_dir)!r},
+    max_bytes={max_bytes!r},
+    data_version={data_version!r},
+)
+""")
+        else:
+            set_option_strs.append("""
+static_interact.CACHE = None
+""")
+        set_option_strs.append(f"""
+static_interact.STREAMING = {self.streaming!r}
+""")
+        if self.interact_budget is not None:
+            set_option_strs.append(f"""
+static_interact.BUDGET = static_preflight.Budget(
+    **{dataclasses.asdict(self.interact_budget)!r}
+)
+""")
+        else:
+            set_option_strs.append("""
+static_interact.BUDGET = None
+""")
+        # Summaries left over from another report would be attributed to
+        # this one's first profiled cell.
+        set_option_strs.append("""
+static_stats.STATS_HOOK = None
+static_stats.pop_recent_summaries()
+""")
+        # Include the static interact runtime once at the top of the
+        # report instead of with every interact; plotly.js is configured
+        # by the library loaders.
+        set_option_strs.append("""
+static_plotly_utils.PLOTLY_URL = None
+static_interact.SHARED_RUNTIME = True
+IPython.display.display(IPython.display.HTML(static_interact.runtime_html()))
+""")
+        set_options_str = "".join(set_option_strs)
 
         new_cells.append(
             nbformat.v4.new_code_cell(
@@ -213,11 +407,26 @@ static_interact.IMAGE_MANAGER = static_interact.InlineImageManager()
 # Auto-generated by leda
 import os
 
+import IPython.display
+
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import cache as static_cache
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import executors as static_executors
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import image_encoders as static_image_encoders
 from leda.vendor.static_ipywidgets.static_ipywidgets \
     import interact as static_interact
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import preflight as static_preflight
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import static_plotly_utils
+from leda.vendor.static_ipywidgets.static_ipywidgets \
+    import stats as static_stats
 
-{set_image_manager_str}
-"""
+{set_options_str}
+""",
+                metadata=SETUP_CELL_METADATA,
             ),
         )
 
@@ -0,0 +1,214 @@
+"""Per-cell execution profiles of reports.
+
+While executing a report, `ExecutePreprocessorWithProgressBar` (with
+`profile=True`) records the wall time, CPU time, and kernel memory of
+every executed cell, which are written next to the report as:
+  - profile.json: One record per cell.
+  - profile.trace.json: Chrome trace (open in chrome://tracing or
+    https://ui.perfetto.dev), with cells as slices and kernel memory as a
+    counter.
+
+Cells with static interacts also record the summary of per-state stats of
+each interact (see `static_ipywidgets.stats`).
+"""
+
+from __future__ import annotations
+
+import ast
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import sys
+from typing import Any, Sequence
+
+import nbformat
+
+import leda.gen.kernels
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+PROFILE_FILENAME = "profile.json"
+TRACE_FILENAME = "profile.trace.json"
+
+# Evaluated in the kernel after every cell.
+STATS_EXPRESSION = (
+    "__import__('leda.gen.profiles').gen.profiles.get_process_stats()"
+)
+
+MAX_LABEL_LEN = 80
+NUM_SUMMARY_CELLS = 10
+
+_INTERACT_STATS_MODULE = (
+    "leda.vendor.static_ipywidgets.static_ipywidgets.stats"
+)
+
+
+def get_process_stats() -> dict[str, Any]:
+    """Get CPU time and resident memory of the current process.
+
+    CPU time includes terminated child processes, e.g., of static interact
+    executors. Also includes summaries of static interacts since the last
+    call, if any.
+    """
+    times = os.times()
+    stats: dict[str, Any] = {
+        "cpu_secs": (
+            times.user
+            + times.system
+            + times.children_user
+            + times.children_system
+        ),
+        "rss_bytes": leda.gen.kernels.get_rss_bytes(),
+    }
+    # NB: Don't import static interacts (and plotly, etc.) if unused.
+    interact_stats = sys.modules.get(_INTERACT_STATS_MODULE)
+    if interact_stats is not None:
+        stats["interacts"] = interact_stats.pop_recent_summaries()
+
+    return stats
+
+
+def parse_stats(user_expression_result: dict[str, Any]) -> dict[str, Any]:
+    """Parse result of `STATS_EXPRESSION`, or return empty if failed."""
+    try:
+        stats = ast.literal_eval(user_expression_result["data"]["text/plain"])
+    except (KeyError, ValueError, SyntaxError):
+        return {}
+
+    return stats if isinstance(stats, dict) else {}
+
+
+def get_label(cell: nbformat.NotebookNode) -> str:
+    r"""Get first non-empty line of cell source, skipping comments.
+
+    >>> get_label(nbformat.v4.new_code_cell("# Load\n\nx = 1\ny = 2"))
+    'x = 1'
+    """
+    source: str = cell.source
+    lines = [line.strip() for line in source.splitlines() if line.strip()]
+    label = next(
+        (line for line in lines if not line.startswith("#")),
+        lines[0] if lines else "",
+    )
+    return label[:MAX_LABEL_LEN]
+
+
+@dataclasses.dataclass(frozen=True)
+class CellProfile:
+    index: int
+    label: str
+    # Secs since start of execution
+    start_secs: float
+    wall_secs: float
+    # Kernel stats; `None` if not available
+    cpu_secs: float | None
+    rss_bytes_before: int | None
+    rss_bytes_after: int | None
+    # Size of outputs in notebook JSON
+    output_bytes: int
+    # Summaries of static interacts executed in the cell
+    interacts: Sequence[dict[str, Any]] = ()
+
+    @property
+    def rss_bytes_delta(self) -> int | None:
+        if self.rss_bytes_before is None or self.rss_bytes_after is None:
+            return None
+
+        return self.rss_bytes_after - self.rss_bytes_before
+
+
+def get_output_bytes(cell: nbformat.NotebookNode) -> int:
+    return len(json.dumps(cell.get("outputs", [])))
+
+
+def to_trace(profiles: Sequence[CellProfile]) -> dict[str, Any]:
+    """Convert profiles to Chrome trace event format."""
+    events: list[dict[str, Any]] = []
+    for profile in profiles:
+        events.append(
+            {
+                "name": f"[{profile.index}] {profile.label}",
+                "cat": "cell",
+                "ph": "X",
+                "ts": profile.start_secs * 1e6,
+                "dur": profile.wall_secs * 1e6,
+                "pid": 1,
+                "tid": 1,
+                "args": dataclasses.asdict(profile),
+            }
+        )
+        for ts_secs, rss_bytes in [
+            (profile.start_secs, profile.rss_bytes_before),
+            (profile.start_secs + profile.wall_secs, profile.rss_bytes_after),
+        ]:
+            if rss_bytes is not None:
+                events.append(
+                    {
+                        "name": "kernel memory",
+                        "ph": "C",
+                        "ts": ts_secs * 1e6,
+                        "pid": 1,
+                        "args": {"rss_mb": rss_bytes / 2**20},
+                    }
+                )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_profiles(
+    profiles: Sequence[CellProfile], dir_path: pathlib.Path
+) -> None:
+    """Write profile and Chrome trace to dir."""
+    dir_path.mkdir(parents=True, exist_ok=True)
+    with (dir_path / PROFILE_FILENAME).open("w") as fh:
+        json.dump(
+            {"cells": [dataclasses.asdict(profile) for profile in profiles]},
+            fh,
+            indent=2,
+        )
+    with (dir_path / TRACE_FILENAME).open("w") as fh:
+        json.dump(to_trace(profiles), fh)
+
+    logger.info("Wrote profile of %s cells to %s", len(profiles), dir_path)
+
+
+def _format_mb(num_bytes: int | None) -> str:
+    return f"{num_bytes / 2**20:+.1f}" if num_bytes is not None else ""
+
+
+def get_summary_cell(
+    profiles: Sequence[CellProfile],
+) -> nbformat.NotebookNode:
+    """Get Markdown cell with table of the slowest cells."""
+    lines = [
+        "### Execution profile",
+        "",
+        f"{len(profiles)} cells executed in "
+        f"{sum(profile.wall_secs for profile in profiles):.1f}s. "
+        "Slowest cells:",
+        "",
+        "| Cell | Wall (s) | CPU (s) | RSS change (MB) | Output (KB) "
+        "| Source |",
+        "|---:|---:|---:|---:|---:|:---|",
+    ]
+    slowest_profiles = sorted(
+        profiles, key=lambda profile: profile.wall_secs, reverse=True
+    )[:NUM_SUMMARY_CELLS]
+    for profile in slowest_profiles:
+        cpu_secs_str = (
+            f"{profile.cpu_secs:.2f}" if profile.cpu_secs is not None else ""
+        )
+        label = profile.label.replace("|", "\\|").replace("`", "'")
+        lines.append(
+            f"| {profile.index} | {profile.wall_secs:.2f} | {cpu_secs_str} "
+            f"| {_format_mb(profile.rss_bytes_delta)} "
+            f"| {profile.output_bytes / 2**10:.1f} | `{label}` |"
+        )
+
+    cell: nbformat.NotebookNode = nbformat.v4.new_markdown_cell(
+        "\n".join(lines)
+    )
+    return cell
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import dataclasses
+import io
 import logging
+import mimetypes
+import os
 import pathlib
+from typing import IO, Any, Iterator, Mapping, Sequence
+import urllib.parse
 
 from typing_extensions import override
 
+import leda.gen.assets
 import leda.gen.base
+import leda.gen.sidecars
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# Fill in types that `mimetypes` doesn't know on older Pythons.
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".webp": "image/webp",
+}
+
 
 def log_loudly(report_url: str) -> None:
     logger.info("*****************************************************")
@@ -28,6 +41,11 @@ class InMemoryReportPublisher(leda.gen.base.ReportPublisher):
         report: leda.gen.base.Report,
         artifact: leda.gen.base.ReportArtifact,
     ) -> None:
+        if isinstance(artifact, leda.gen.base.FileReportArtifact):
+            # Load before the file is cleaned up.
+            artifact = leda.gen.base.ReportArtifact(
+                artifact.body, images=artifact.images
+            )
         self.artifact = artifact
 
 
@@ -35,6 +53,18 @@ class InMemoryReportPublisher(leda.gen.base.ReportPublisher):
 class FileReportPublisher(leda.gen.base.ReportPublisher):
     output_dir: pathlib.Path
 
+    # Write compressed copies of text files for static servers, e.g.,
+    # `["gzip", "br"]`; see `leda.gen.sidecars`.
+    precompress: Sequence[str] = ()
+    # Write manifest of content hashes of all files.
+    hash_manifest: bool = False
+    # Number of threads used to compress and hash files.
+    jobs: int | None = None
+
+    def __post_init__(self) -> None:
+        # Fail before generating the report.
+        leda.gen.sidecars.check_formats(self.precompress)
+
     def _log_loudly(self, report_url: str) -> None:
         """Log final report URL loudly to user.
 
@@ -52,12 +82,243 @@ class FileReportPublisher(leda.gen.base.ReportPublisher):
         logger.info("Publishing %r to %s", report.name, self.output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         index_path = self.output_dir / "index.html"
-        index_path.write_bytes(artifact.body)
+        artifact.write_to(index_path)
 
         image_path = self.output_dir / "images"
         for image_filename, image_body in artifact.images.items():
             (image_path / image_filename).write_bytes(image_body)
 
+        if self.precompress or self.hash_manifest:
+            leda.gen.sidecars.write_sidecars(
+                self.output_dir,
+                formats=self.precompress,
+                manifest=self.hash_manifest,
+                jobs=self.jobs,
+            )
+
         report_url = str(index_path)
         self._log_loudly(report_url)
         return report_url
+
+
+def get_content_type(path: str) -> str:
+    """Get content type of file by its extension.
+
+    >>> get_content_type("index.html"), get_content_type("images/a.png")
+    ('text/html; charset=utf-8', 'image/png')
+    """
+    content_type = _CONTENT_TYPES.get(os.path.splitext(path)[1].lower())
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(path)
+    return content_type or "application/octet-stream"
+
+
+def parse_s3_url(url: str) -> tuple[str, str]:
+    """Parse S3 URL into bucket and key prefix.
+
+    >>> parse_s3_url("s3://my-bucket/reports/daily")
+    ('my-bucket', 'reports/daily')
+    """
+    parsed_url = urllib.parse.urlparse(url)
+    if parsed_url.scheme != "s3" or not parsed_url.netloc:
+        raise ValueError(f"Invalid S3 URL: {url!r}")
+
+    return parsed_url.netloc, parsed_url.path.strip("/")
+
+
+@dataclasses.dataclass()
+class S3ReportPublisher(leda.gen.base.ReportPublisher):
+    """Upload reports to S3 or an S3-compatible store (e.g., MinIO).
+
+    Each report is uploaded to `{prefix}/{report.full_name}/`: its
+    `index.html`, in-memory images, and all files in `local_dir` (e.g.,
+    the `images/` of `FileImageManager`). Shared assets are uploaded once
+    per publisher.
+
+    All files of a report share a bounded pool of upload threads and
+    connections; bodies larger than `multipart_threshold` are uploaded
+    in parts, in parallel. The client is reused across reports.
+
+    Requires boto3.
+    """
+
+    bucket: str
+    prefix: str = ""
+    # Local dir with files written during generation, if any.
+    local_dir: pathlib.Path | None = None
+    # E.g., "http://localhost:9000" for MinIO.
+    endpoint_url: str | None = None
+    # Extra args of `boto3.client()`, e.g., `region_name`.
+    client_kwargs: Mapping[str, Any] = dataclasses.field(default_factory=dict)
+
+    # Max number of concurrent uploads (and connections).
+    jobs: int = 16
+    multipart_threshold: int = 8 * 2**20
+    multipart_chunk_size: int = 8 * 2**20
+
+    # Reports may be republished under the same name, but images are
+    # named by content.
+    html_cache_control: str | None = "no-cache"
+    asset_cache_control: str | None = "public, max-age=31536000, immutable"
+
+    # E.g., "https://reports.example.com" if the bucket is served as a
+    # website; report URLs are "s3://..." otherwise.
+    url_prefix: str | None = None
+
+    # Shared assets dir (see `leda.gen.assets`), uploaded to
+    # `{prefix}/assets/`.
+    shared_assets_dir: pathlib.Path | None = None
+
+    _client: Any = dataclasses.field(default=None, init=False, repr=False)
+    _uploaded_asset_names: set[str] = dataclasses.field(
+        default_factory=set, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.jobs < 1:
+            raise ValueError(f"Invalid number of jobs: {self.jobs}")
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            try:
+                import boto3
+                import botocore.config
+            except ImportError:
+                raise ImportError("S3 publishing requires boto3") from None
+
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                config=botocore.config.Config(max_pool_connections=self.jobs),
+                **self.client_kwargs,
+            )
+
+        return self._client
+
+    def _get_key(self, report: leda.gen.base.Report, rel_path: str) -> str:
+        return "/".join(
+            part
+            for part in [self.prefix.strip("/"), report.full_name, rel_path]
+            if part
+        )
+
+    def _get_shared_asset_key(self, name: str) -> str:
+        return "/".join(
+            part
+            for part in [
+                self.prefix.strip("/"),
+                leda.gen.assets.ASSETS_DIR_NAME,
+                name,
+            ]
+            if part
+        )
+
+    def _get_url(self, key: str) -> str:
+        """Get URL of uploaded object.
+
+        Child classes may find it useful to override this method to,
+        e.g., point to a CDN.
+        """
+        if self.url_prefix is not None:
+            return f"{self.url_prefix.rstrip('/')}/{key}"
+
+        return f"s3://{self.bucket}/{key}"
+
+    def _iter_files(
+        self,
+        report: leda.gen.base.Report,
+        artifact: leda.gen.base.ReportArtifact,
+    ) -> Iterator[tuple[str, str | IO[bytes]]]:
+        """Iterate over keys and sources (paths or file objs)."""
+        # NB: The generator may write the body to a temp file in the local
+        # dir, which is uploaded as index.html only.
+        body_path = None
+        if isinstance(artifact, leda.gen.base.FileReportArtifact):
+            body_path = artifact.path.resolve()
+            yield self._get_key(report, "index.html"), str(artifact.path)
+        else:
+            yield (
+                self._get_key(report, "index.html"),
+                io.BytesIO(artifact.body),
+            )
+
+        for image_filename, image_body in artifact.images.items():
+            yield (
+                self._get_key(report, f"images/{image_filename}"),
+                io.BytesIO(image_body),
+            )
+
+        if self.local_dir is not None and self.local_dir.exists():
+            for path in sorted(self.local_dir.rglob("*")):
+                rel_path = path.relative_to(self.local_dir).as_posix()
+                if (
+                    path.is_file()
+                    and rel_path != "index.html"
+                    and path.resolve() != body_path
+                ):
+                    yield self._get_key(report, rel_path), str(path)
+
+        if (
+            self.shared_assets_dir is not None
+            and self.shared_assets_dir.exists()
+        ):
+            for path in sorted(self.shared_assets_dir.iterdir()):
+                # Named by content, so never changes once uploaded.
+                if path.name not in self._uploaded_asset_names:
+                    self._uploaded_asset_names.add(path.name)
+                    yield self._get_shared_asset_key(path.name), str(path)
+
+    @override
+    def publish(
+        self,
+        report: leda.gen.base.Report,
+        artifact: leda.gen.base.ReportArtifact,
+    ) -> str | None:
+        from boto3.s3.transfer import TransferConfig, create_transfer_manager
+
+        client = self._get_client()
+        config = TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunk_size,
+            max_concurrency=self.jobs,
+        )
+
+        logger.info(
+            "Publishing %r to s3://%s/%s",
+            report.name,
+            self.bucket,
+            self._get_key(report, ""),
+        )
+        index_key = self._get_key(report, "index.html")
+        num_files = 0
+        with create_transfer_manager(client, config) as manager:
+            futures = []
+            for key, src in self._iter_files(report, artifact):
+                extra_args = {"ContentType": get_content_type(key)}
+                cache_control = (
+                    self.html_cache_control
+                    if key == index_key
+                    else self.asset_cache_control
+                )
+                if cache_control is not None:
+                    extra_args["CacheControl"] = cache_control
+
+                futures.append(
+                    manager.upload(
+                        src,
+                        self.bucket,
+                        key,
+                        extra_args=extra_args,
+                    )
+                )
+                num_files += 1
+
+            # Raise the first error, if any; the rest are cancelled.
+            for future in futures:
+                future.result()
+
+        logger.info("Uploaded %s files", num_files)
+
+        report_url = self._get_url(index_key)
+        log_loudly(report_url)
+        return report_url
@@ -1,21 +1,87 @@
 from __future__ import annotations
 
+import concurrent.futures
 import dataclasses
+import datetime
+import json
 import logging
+import multiprocessing
+import multiprocessing.util
+import os
 import pathlib
+import time
+import traceback
+from typing import Any, Mapping, Sequence
 
 import nbformat
+import tqdm
 from typing_extensions import override
 
+import leda.gen.assets
 import leda.gen.base
+import leda.gen.cell_cache
 import leda.gen.generators
+import leda.gen.kernels
+import leda.gen.loaders
 import leda.gen.modifiers
 import leda.gen.publishers
+from leda.vendor.static_ipywidgets.static_ipywidgets import preflight
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+@dataclasses.dataclass(frozen=True)
+class InteractOptions:
+    """Options of static interacts."""
+
+    # Number of processes used to generate static interact outputs.
+    jobs: int | None = None
+    # Release results as soon as they're rendered (static_ipywidgets only).
+    streaming: bool = False
+
+    # Encoding of static interact images (static_ipywidgets only).
+    image_format: str = "png"
+    image_quality: int | None = None
+    image_optimize: bool = False
+    image_colors: int | None = None
+    plotly_significant_digits: int | None = None
+
+    # Overridden by `Report.interact_budget`.
+    budget: preflight.Budget | None = None
+    # Write embedded states to JSON files (panel only).
+    external_states: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheOptions:
+    """Options of the caches of static interact outputs and cells."""
+
+    interact_cache_dir: pathlib.Path | None = None
+    cell_cache_dir: pathlib.Path | None = None
+    # Checkpoint the kernel namespace after every cell.
+    cell_checkpoints: bool = False
+    # Max size of each cache.
+    max_bytes: int | None = None
+    data_version: str | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class PublishOptions:
+    """Options of publishing reports."""
+
+    # Upload to S3 instead of only writing to the local dir.
+    s3_url: str | None = None
+    s3_endpoint_url: str | None = None
+
+    # Local dir only.
+    precompress: Sequence[str] = ()
+    hash_manifest: bool = False
+
+    shared_assets: bool = False
+    vendored_libraries: bool = False
+
+
 @dataclasses.dataclass()
 class MainReportRunner(leda.gen.base.ReportRunner):
     modifier: leda.gen.base.ReportModifier
@@ -30,10 +96,13 @@ class MainReportRunner(leda.gen.base.ReportRunner):
 
         html_title = report.html_title if report.html_title else report.name
 
-        body = self.generator.generate(nb_contents, html_title=html_title)
-        artifact = leda.gen.base.ReportArtifact(body)
-
-        return self.publisher.publish(report, artifact)
+        artifact = self.generator.generate_artifact(
+            nb_contents, html_title=html_title
+        )
+        try:
+            return self.publisher.publish(report, artifact)
+        finally:
+            artifact.cleanup()
 
     @classmethod
     def get_default_runner(
@@ -45,40 +114,298 @@ class MainReportRunner(leda.gen.base.ReportRunner):
         progress: bool = False,
         template_name: str | None = None,
         theme: str | None = None,
+        profile: bool = False,
+        profile_summary: bool = False,
+        interact_options: InteractOptions | None = None,
+        cache_options: CacheOptions | None = None,
+        publish_options: PublishOptions | None = None,
+        kernel_pool: leda.gen.kernels.KernelPool | None = None,
     ) -> MainReportRunner:
         if isinstance(report, pathlib.Path):
             report = leda.gen.base.FileReport(name=report.stem, nb_path=report)
 
+        interact = interact_options or InteractOptions()
+        cache = cache_options or CacheOptions()
+        publish = publish_options or PublishOptions()
+
         output_dir_path = local_dir_path / report.full_name
+        shared_assets_dir_path = (
+            local_dir_path / leda.gen.assets.ASSETS_DIR_NAME
+            if publish.shared_assets or publish.vendored_libraries
+            else None
+        )
+        library_urls = (
+            leda.gen.loaders.write_vendored_libraries(
+                local_dir_path / leda.gen.assets.ASSETS_DIR_NAME,
+                "../" + leda.gen.assets.ASSETS_DIR_NAME,
+            )
+            if publish.vendored_libraries
+            else None
+        )
+
+        interact_budget = (
+            report.interact_budget
+            if report.interact_budget is not None
+            else interact.budget
+        )
 
         modifier: leda.gen.base.ReportModifier
         if static_interact_mode_alias == "static_ipywidgets":
             modifier = leda.gen.modifiers.StaticIpywidgetsReportModifier(
-                output_dir_path, inject_code=report.inject_code
+                output_dir_path,
+                inject_code=report.inject_code,
+                library_urls=library_urls,
+                jobs=interact.jobs,
+                streaming=interact.streaming,
+                image_format=interact.image_format,
+                image_quality=interact.image_quality,
+                image_optimize=interact.image_optimize,
+                image_colors=interact.image_colors,
+                plotly_significant_digits=interact.plotly_significant_digits,
+                cache_dir=cache.interact_cache_dir,
+                cache_max_bytes=cache.max_bytes,
+                cache_data_version=cache.data_version,
+                interact_budget=interact_budget,
             )
         elif static_interact_mode_alias == "panel":
             modifier = leda.gen.modifiers.StaticPanelReportModifier(
-                inject_code=report.inject_code
+                inject_code=report.inject_code,
+                library_urls=library_urls,
+                state_dir_path=(
+                    output_dir_path / leda.gen.modifiers.STATES_DIR_NAME
+                    if interact.external_states
+                    else None
+                ),
+                interact_budget=interact_budget,
+                jobs=interact.jobs,
             )
         else:
             raise ValueError(
                 f"Unknown static interact mode: {static_interact_mode_alias!r}"
             )
 
+        cell_cache = None
+        if cache.cell_cache_dir is not None:
+            cell_cache = leda.gen.cell_cache.CellExecutionCache(
+                str(cache.cell_cache_dir),
+                max_bytes=(
+                    cache.max_bytes
+                    if cache.max_bytes is not None
+                    else leda.gen.cell_cache.DEFAULT_MAX_BYTES
+                ),
+                data_version=json.dumps(
+                    [cache.data_version or "", report.inject_code or ""]
+                ),
+                checkpoints=cache.cell_checkpoints,
+            )
+
         generator = leda.gen.generators.MainStaticReportGenerator(
             cell_timeout=report.cell_timeout,
             kernel_name=kernel_name,
             progress=progress,
             template_name=template_name,
             theme=theme,
+            cell_cache=cell_cache,
+            output_dir_path=output_dir_path,
+            kernel_pool=kernel_pool,
+            shared_assets_dir_path=(
+                shared_assets_dir_path if publish.shared_assets else None
+            ),
+            library_urls=library_urls,
+            profile=profile,
+            profile_summary=profile_summary,
         )
 
-        publisher = leda.gen.publishers.FileReportPublisher(
-            output_dir=output_dir_path
-        )
+        publisher: leda.gen.base.ReportPublisher
+        if publish.s3_url is not None:
+            bucket, prefix = leda.gen.publishers.parse_s3_url(publish.s3_url)
+            # Files written during generation are uploaded from the
+            # local dir.
+            publisher = leda.gen.publishers.S3ReportPublisher(
+                bucket,
+                prefix=prefix,
+                local_dir=output_dir_path,
+                endpoint_url=publish.s3_endpoint_url,
+                shared_assets_dir=shared_assets_dir_path,
+            )
+        else:
+            publisher = leda.gen.publishers.FileReportPublisher(
+                output_dir=output_dir_path,
+                precompress=publish.precompress,
+                hash_manifest=publish.hash_manifest,
+            )
 
         return MainReportRunner(
             modifier=modifier,
             generator=generator,
             publisher=publisher,
         )
+
+
+@dataclasses.dataclass(frozen=True)
+class RunnerOptions:
+    """Args of `MainReportRunner.get_default_runner()` shared by reports."""
+
+    kernel_name: str | None = None
+    template_name: str | None = None
+    theme: str | None = None
+    profile: bool = False
+    profile_summary: bool = False
+    interact: InteractOptions = InteractOptions()
+    cache: CacheOptions = CacheOptions()
+    publish: PublishOptions = PublishOptions()
+
+    def get_runner(
+        self,
+        report: pathlib.Path | leda.gen.base.Report,
+        local_dir_path: pathlib.Path,
+        static_interact_mode_alias: str,
+        progress: bool = False,
+        kernel_pool: leda.gen.kernels.KernelPool | None = None,
+    ) -> MainReportRunner:
+        return MainReportRunner.get_default_runner(
+            report,
+            local_dir_path,
+            static_interact_mode_alias,
+            kernel_name=self.kernel_name,
+            progress=progress,
+            template_name=self.template_name,
+            theme=self.theme,
+            profile=self.profile,
+            profile_summary=self.profile_summary,
+            interact_options=self.interact,
+            cache_options=self.cache,
+            publish_options=self.publish,
+            kernel_pool=kernel_pool,
+        )
+
+
+# Per-worker state of `ParallelReportSetRunner`.
+_WORKER_KERNEL_POOL: leda.gen.kernels.KernelPool | None = None
+
+
+def _init_worker(kernel_pool_kwargs: Mapping[str, Any] | None) -> None:
+    global _WORKER_KERNEL_POOL
+
+    if kernel_pool_kwargs is not None:
+        _WORKER_KERNEL_POOL = leda.gen.kernels.KernelPool(**kernel_pool_kwargs)
+        # NB: Workers don't run atexit handlers.
+        multiprocessing.util.Finalize(
+            _WORKER_KERNEL_POOL, _WORKER_KERNEL_POOL.close, exitpriority=10
+        )
+
+
+def _run_report(
+    report: leda.gen.base.Report,
+    local_dir_path: pathlib.Path,
+    static_interact_mode_alias: str,
+    runner_options: RunnerOptions,
+) -> leda.gen.base.ReportResult:
+    start_time = time.monotonic()
+    try:
+        runner = runner_options.get_runner(
+            report,
+            local_dir_path,
+            static_interact_mode_alias,
+            kernel_pool=_WORKER_KERNEL_POOL,
+        )
+        url = runner.run(report)
+    except Exception:
+        logger.exception("Report %r failed", report.name)
+        return leda.gen.base.ReportResult(
+            report,
+            duration=datetime.timedelta(seconds=time.monotonic() - start_time),
+            error=traceback.format_exc(),
+        )
+
+    return leda.gen.base.ReportResult(
+        report,
+        duration=datetime.timedelta(seconds=time.monotonic() - start_time),
+        url=url,
+    )
+
+
+@dataclasses.dataclass()
+class ParallelReportSetRunner(leda.gen.base.ReportSetRunner):
+    """Run reports on a pool of worker processes.
+
+    Each report is run with `RunnerOptions.get_runner()`. Each
+    worker reuses its kernels (see `KernelPool`) and HTML exporter across
+    the reports it runs.
+
+    A failed report doesn't stop the other reports; see
+    `ReportResult.error`.
+
+    Workers are spawned, so scripts that use this runner need the usual
+    `if __name__ == "__main__":` guard.
+    """
+
+    local_dir_path: pathlib.Path
+    static_interact_mode_alias: str
+
+    # Number of worker processes; defaults to the number of cores.
+    jobs: int | None = None
+    runner_options: RunnerOptions = RunnerOptions()
+    # Args of each worker's `KernelPool`; set to `None` to start a new
+    # kernel for every report.
+    kernel_pool_kwargs: Mapping[str, Any] | None = dataclasses.field(
+        default_factory=dict
+    )
+    progress: bool = False
+
+    def __post_init__(self) -> None:
+        if self.jobs is not None and self.jobs < 1:
+            raise ValueError(f"Invalid number of jobs: {self.jobs}")
+
+    @override
+    def run(
+        self, report_set: leda.gen.base.ReportSet
+    ) -> list[leda.gen.base.ReportResult]:
+        reports = report_set.reports
+        jobs = min(self.jobs or os.cpu_count() or 1, max(len(reports), 1))
+        logger.info("Running %s reports on %s workers", len(reports), jobs)
+
+        results: list[leda.gen.base.ReportResult | None] = [None] * len(
+            reports
+        )
+        # NB: Spawn instead of fork, since this process may have threads
+        # (e.g., of kernel clients) that hold locks.
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.kernel_pool_kwargs,),
+        ) as executor:
+            future_to_index = {
+                executor.submit(
+                    _run_report,
+                    report,
+                    self.local_dir_path,
+                    self.static_interact_mode_alias,
+                    self.runner_options,
+                ): index
+                for index, report in enumerate(reports)
+            }
+            for future in tqdm.tqdm(
+                concurrent.futures.as_completed(future_to_index),
+                desc="Running reports",
+                total=len(reports),
+                disable=not self.progress,
+            ):
+                index = future_to_index[future]
+                try:
+                    results[index] = future.result()
+                except Exception:
+                    # E.g., the worker crashed.
+                    logger.exception("Report %r failed", reports[index].name)
+                    results[index] = leda.gen.base.ReportResult(
+                        reports[index],
+                        duration=datetime.timedelta(),
+                        error=traceback.format_exc(),
+                    )
+
+        num_failed = sum(1 for result in results if result and not result.ok)
+        if num_failed:
+            logger.warning("%s of %s reports failed", num_failed, len(reports))
+
+        return [result for result in results if result is not None]
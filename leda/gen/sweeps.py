@@ -0,0 +1,161 @@
+"""Parameter sweeps: generate one report per set of params.
+
+Param sets can be read from a file:
+  - JSON/YAML: Either a list of param sets (mappings), or a mapping of
+    param name -> list of values, which is expanded into the grid of all
+    combinations. YAML requires PyYAML.
+  - CSV: One param set per row, with param names in the header.
+
+or given as a grid on the command line, e.g.:
+
+>>> parse_param_grid(["portfolio=abc,def", "window=10,20"])
+{'portfolio': ['abc', 'def'], 'window': [10, 20]}
+"""
+
+from __future__ import annotations
+
+import ast
+import csv
+import itertools
+import json
+import pathlib
+import re
+from typing import Any, Mapping, Sequence
+
+import leda.gen.base
+
+ParamSet = Mapping[str, Any]
+
+_TAG_UNSAFE_PATTERN = re.compile(r"[^A-Za-z0-9_.=-]+")
+MAX_TAG_LEN = 80
+
+
+def parse_value(value: str) -> Any:
+    """Parse Python literal, falling back to str.
+
+    >>> parse_value("10"), parse_value("abc"), parse_value("[1, 2]")
+    (10, 'abc', [1, 2])
+    """
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def parse_param_grid(param_strs: Sequence[str]) -> dict[str, list[Any]]:
+    """Parse `key=v1,v2` strs into param name -> values.
+
+    Note that values can't contain commas.
+    """
+    grid: dict[str, list[Any]] = {}
+    for param_str in param_strs:
+        key, sep, values_str = param_str.partition("=")
+        key = key.strip()
+        if not sep or not key.isidentifier():
+            raise ValueError(f"Invalid param: {param_str!r}")
+        if key in grid:
+            raise ValueError(f"Duplicate param: {key!r}")
+
+        grid[key] = [parse_value(value) for value in values_str.split(",")]
+
+    return grid
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> list[ParamSet]:
+    """Expand param name -> values into all combinations.
+
+    >>> expand_grid({"x": [1, 2], "y": ["a"]})
+    [{'x': 1, 'y': 'a'}, {'x': 2, 'y': 'a'}]
+    """
+    keys = list(grid)
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(grid[key] for key in keys))
+    ]
+
+
+def _to_param_sets(obj: Any, path: pathlib.Path) -> list[ParamSet]:
+    if isinstance(obj, list) and all(isinstance(item, dict) for item in obj):
+        return obj
+    elif isinstance(obj, dict) and all(
+        isinstance(values, list) for values in obj.values()
+    ):
+        return expand_grid(obj)
+
+    raise ValueError(
+        f"{path}: Expected list of param sets or mapping of param name "
+        "to list of values"
+    )
+
+
+def load_param_sets(path: pathlib.Path) -> list[ParamSet]:
+    """Load param sets from a JSON, YAML, or CSV file."""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        with path.open() as fh:
+            return _to_param_sets(json.load(fh), path)
+    elif suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML sweep files require PyYAML") from None
+
+        with path.open() as fh:
+            return _to_param_sets(yaml.safe_load(fh), path)
+    elif suffix == ".csv":
+        with path.open(newline="") as fh:
+            return [
+                {key: parse_value(value) for key, value in row.items()}
+                for row in csv.DictReader(fh)
+            ]
+
+    raise ValueError(f"Unsupported sweep file type: {path}")
+
+
+def combine_param_sets(
+    param_sets: Sequence[ParamSet] | None, grid: Mapping[str, Sequence[Any]]
+) -> list[ParamSet]:
+    """Combine every param set with every combination of the grid."""
+    grid_param_sets = expand_grid(grid) if grid else [{}]
+    return [
+        {**param_set, **grid_param_set}
+        for param_set in (param_sets if param_sets is not None else [{}])
+        for grid_param_set in grid_param_sets
+    ]
+
+
+def get_sweep_tag(params: ParamSet, tag: str | None = None) -> str:
+    """Get report tag from params (and base tag, if any).
+
+    >>> get_sweep_tag({"portfolio": "abc", "window": 10}, tag="daily")
+    'daily-portfolio=abc_window=10'
+    """
+    params_str = "_".join(f"{key}={value}" for key, value in params.items())
+    params_str = _TAG_UNSAFE_PATTERN.sub("-", params_str)[:MAX_TAG_LEN]
+    return "-".join(part for part in [tag, params_str] if part)
+
+
+def write_manifest(
+    results: Sequence[leda.gen.base.ReportResult], path: pathlib.Path
+) -> None:
+    """Write summary of sweep results as JSON."""
+    manifest = {
+        "num_reports": len(results),
+        "num_failed": sum(1 for result in results if not result.ok),
+        "reports": [
+            {
+                "name": result.report.name,
+                "tag": result.report.tag,
+                "params": dict(result.report.params or {}),
+                "ok": result.ok,
+                "url": result.url,
+                "duration_secs": result.duration.total_seconds(),
+                "error": result.error,
+            }
+            for result in results
+        ],
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fh:
+        json.dump(manifest, fh, indent=2, default=repr)
@@ -1,6 +1,8 @@
 import abc
 from typing import Any, Callable
 
+import leda.interacting.constraints
+
 
 # noinspection PyProtectedMember
 def is_matplotlib(obj: Any) -> bool:
@@ -43,5 +45,22 @@ class InteractMode(abc.ABC):
     @abc.abstractmethod
     def interact(self, func: Callable, **kwargs: Any) -> Any: ...
 
+    def interact_constrained(
+        self,
+        func: Callable,
+        constraint: leda.interacting.constraints.Constraint,
+        **kwargs: Any,
+    ) -> Any:
+        """Interact over only the states admitted by the constraint.
+
+        By default, this still goes through every state, but invalid
+        states show a message instead of calling `func`. Modes that can
+        skip invalid states entirely should override this.
+        """
+        return self.interact(
+            leda.interacting.constraints.mask_invalid_states(func, constraint),
+            **kwargs,
+        )
+
     def process_result(self, obj: Any) -> Any:
         return obj
@@ -0,0 +1,141 @@
+"""Constraints that restrict interacts to a subset of widget states.
+
+By default, an interact covers the full Cartesian product of its widget
+values. A constraint marks which combinations are admissible, e.g.:
+
+>>> constraint = DependentOptionsConstraint(
+...     parent="desk", child="region", options={"A": ["us", "eu"]}
+... )
+>>> constraint.is_valid({"desk": "A", "region": "eu"})
+True
+>>> constraint.is_valid({"desk": "A", "region": "asia"})
+False
+"""
+
+from __future__ import annotations
+
+import abc
+import dataclasses
+import functools
+from typing import Any, Callable, Mapping, Sequence, Union, cast
+
+from typing_extensions import override
+
+INVALID_STATE_MESSAGE = "*This combination of values is not available.*"
+
+
+class Constraint(abc.ABC):
+    @abc.abstractmethod
+    def is_valid(self, values: Mapping[str, Any]) -> bool:
+        """Whether this combination of widget values is admissible.
+
+        Args:
+            values: Widget name -> value.
+        """
+        ...
+
+
+@dataclasses.dataclass(frozen=True)
+class PredicateConstraint(Constraint):
+    """Admit states for which `predicate(**values)` is true."""
+
+    predicate: Callable[..., bool]
+
+    @override
+    def is_valid(self, values: Mapping[str, Any]) -> bool:
+        return bool(self.predicate(**values))
+
+
+@dataclasses.dataclass(frozen=True)
+class AllowedStatesConstraint(Constraint):
+    """Admit only an explicit list of states.
+
+    Each state maps (some or all) widget names to values; widgets that
+    a state doesn't mention can take any value.
+    """
+
+    states: Sequence[Mapping[str, Any]]
+
+    @override
+    def is_valid(self, values: Mapping[str, Any]) -> bool:
+        return any(
+            all(values[name] == value for name, value in state.items())
+            for state in self.states
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class DependentOptionsConstraint(Constraint):
+    """Restrict the options of one widget based on another's value.
+
+    Parent values missing from `options` admit no child values.
+    """
+
+    parent: str
+    child: str
+    options: Mapping[Any, Sequence[Any]]
+
+    @override
+    def is_valid(self, values: Mapping[str, Any]) -> bool:
+        return values[self.child] in self.options.get(values[self.parent], ())
+
+
+@dataclasses.dataclass(frozen=True)
+class AllConstraint(Constraint):
+    """Admit states that satisfy all the given constraints."""
+
+    constraints: Sequence[Constraint]
+
+    @override
+    def is_valid(self, values: Mapping[str, Any]) -> bool:
+        return all(
+            constraint.is_valid(values) for constraint in self.constraints
+        )
+
+
+ConstraintLike = Union[
+    Constraint, Callable[..., bool], Sequence[Mapping[str, Any]]
+]
+
+
+def to_constraint(
+    obj: ConstraintLike | Sequence[ConstraintLike],
+) -> Constraint:
+    """Convert a predicate, list of allowed states, etc. to a constraint.
+
+    >>> to_constraint(lambda x, y: x < y).is_valid({"x": 1, "y": 2})
+    True
+    >>> to_constraint([{"x": 1, "y": 2}]).is_valid({"x": 1, "y": 3})
+    False
+    """
+    if isinstance(obj, Constraint):
+        return obj
+    elif callable(obj):
+        return PredicateConstraint(obj)
+    elif isinstance(obj, Sequence) and all(
+        isinstance(item, Mapping) for item in obj
+    ):
+        return AllowedStatesConstraint(obj)  # type: ignore[arg-type]
+    elif isinstance(obj, Sequence):
+        return AllConstraint(
+            [to_constraint(cast(ConstraintLike, item)) for item in obj]
+        )
+
+    raise TypeError(f"Can't convert to constraint: {type(obj)}")
+
+
+def mask_invalid_states(func: Callable, constraint: Constraint) -> Callable:
+    """Wrap `func` so that it shows a message for invalid states.
+
+    Used by interact modes that always go through every state.
+    """
+    import IPython.display
+
+    @functools.wraps(func)
+    def wrapper(**kwargs: Any) -> Any:
+        if not constraint.is_valid(kwargs):
+            return IPython.display.Markdown(INVALID_STATE_MESSAGE)
+
+        return func(**kwargs)
+
+    return wrapper
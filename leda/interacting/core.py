@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+from typing import Any, Callable, Sequence
 
 import IPython
 
 import leda.interacting.base
+import leda.interacting.constraints
 import leda.interacting.dynamic
 
 GLOBAL_INTERACT_MODE: leda.interacting.base.InteractMode = (
@@ -35,7 +36,13 @@ def init(plot_lib: str) -> None:
     get_interact_mode().init(plot_lib)
 
 
-def interact(func: Callable, **kwargs: Any) -> Any:
+def interact(
+    func: Callable,
+    constraint: leda.interacting.constraints.ConstraintLike
+    | Sequence[leda.interacting.constraints.ConstraintLike]
+    | None = None,
+    **kwargs: Any,
+) -> Any:
     """Return object that displays Cartesian product of kwarg inputs.
 
     E.g.:
@@ -47,6 +54,17 @@ def interact(func: Callable, **kwargs: Any) -> Any:
     >>> interact(foo, x=[1, 2, 3], y=(1.0, 2.0))  # doctest: +SKIP
     interactive(...)
 
+    Use `constraint` to only cover some of the product, e.g.,
+    with a predicate, a list of allowed states, or dependent options:
+
+    >>> interact(foo, x=[1, 2, 3], y=[1, 2], constraint=lambda x, y: x > y)  # doctest: +SKIP
+    >>> interact(foo, x=[1, 2], y=[1, 2], constraint=[{"x": 1}, {"y": 2}])  # doctest: +SKIP
+
     Equivalent to the `%%interact` magic.
-    """
-    return get_interact_mode().interact(func, **kwargs)
+    """  # noqa: E501
+    if constraint is None:
+        return get_interact_mode().interact(func, **kwargs)
+
+    return get_interact_mode().interact_constrained(
+        func, leda.interacting.constraints.to_constraint(constraint), **kwargs
+    )
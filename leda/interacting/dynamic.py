@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import collections
+import dataclasses
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Hashable, Mapping
 
+import IPython.display
+import IPython.utils.capture
 import ipywidgets
 from typing_extensions import override
 
 import leda.interacting.base
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
 
 def to_dynamic_ipywidgets(values: dict[str, Any]) -> dict[str, Any]:
     new_values = {}
@@ -24,7 +35,241 @@ def to_dynamic_ipywidgets(values: dict[str, Any]) -> dict[str, Any]:
     return new_values
 
 
+def get_neighbor_values(widget: Any) -> list[Any]:
+    """Get values adjacent to the current value of widget, if known.
+
+    >>> get_neighbor_values(ipywidgets.IntSlider(value=0, min=0, max=4))
+    [1]
+    >>> get_neighbor_values(ipywidgets.Dropdown(options=["a", "b", "c"], value="b"))
+    ['a', 'c']
+    """  # noqa: E501
+    if isinstance(widget, (ipywidgets.IntSlider, ipywidgets.FloatSlider)):
+        values = [widget.value - widget.step, widget.value + widget.step]
+        if isinstance(widget, ipywidgets.FloatSlider):
+            values = [round(value, 10) for value in values]
+
+        return [value for value in values if widget.min <= value <= widget.max]
+    elif isinstance(widget, ipywidgets.widgets.widget_selection._Selection):
+        options = [value for _, value in widget._options_full]  # pyright: ignore
+        index = widget.index
+        if index is None:
+            return []
+
+        return [
+            options[pos]
+            for pos in (index - 1, index + 1)
+            if 0 <= pos < len(options)
+        ]
+    elif isinstance(widget, ipywidgets.Checkbox):
+        return [not widget.value]
+
+    return []
+
+
+def _get_num_bytes(captured: IPython.utils.capture.CapturedIO) -> int:
+    return (
+        len(captured.stdout)
+        + len(captured.stderr)
+        + sum(
+            len(str(value))
+            for output in captured.outputs
+            for value in output.data.values()
+        )
+    )
+
+
+class MemoizedFunction:
+    """Interact function that memoizes the outputs of states in memory.
+
+    The outputs of every state (i.e., everything the function prints and
+    displays, and its result) are captured and kept in an LRU cache, and
+    replayed when the state is shown again.
+
+    With `prefetch`, once the widgets haven't changed for a while, the
+    function is called for the states one step away from the current one
+    (i.e., the adjacent values of every widget) in a background thread.
+    Output can't be captured there (e.g., `sys.stdout` is shared with the
+    cells running meanwhile), so only the results of prefetches are kept,
+    and displayed on the main thread once their state is shown. Functions
+    that print or display anything themselves are therefore never
+    prefetched. Note that prefetches never run concurrently with the
+    function on the main thread, but they may with other cells, which then
+    must not depend on the same global state.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        widgets: Mapping[str, Any],
+        max_bytes: int,
+        prefetch: bool = False,
+        prefetch_delay_secs: float = 0.5,
+    ) -> None:
+        self.func = func
+        self.widgets = widgets
+        self.max_bytes = max_bytes
+        self.prefetch = prefetch
+        self.prefetch_delay_secs = prefetch_delay_secs
+
+        self.num_hits = 0
+        self.num_misses = 0
+        self._outputs: collections.OrderedDict[
+            Hashable, tuple[IPython.utils.capture.CapturedIO, int]
+        ] = collections.OrderedDict()
+        self._num_bytes = 0
+        # Results of prefetched states, which aren't rendered yet
+        self._prefetched: dict[Hashable, Any] = {}
+        # Whether the function only returns its output, i.e., can be
+        # prefetched; unknown until its first call
+        self._returns_output: bool | None = None
+        # Held while computing any state
+        self._lock = threading.Lock()
+        # Incremented on every call, to cancel outdated prefetches
+        self._generation = 0
+
+    def get_function(self) -> Callable:
+        """Get function for ipywidgets, with the wrapped signature."""
+
+        @functools.wraps(self.func)
+        def wrapper(**kwargs: Any) -> None:
+            self(**kwargs)
+
+        return wrapper
+
+    def __call__(self, **kwargs: Any) -> None:
+        self._generation += 1
+        key = self._get_key(kwargs)
+        with self._lock:
+            captured = self._get(key)
+            if captured is None and key in self._prefetched:
+                self.num_hits += 1
+                captured = self._render(self._prefetched[key])
+                self._put(key, captured)
+            elif captured is None:
+                self.num_misses += 1
+                captured = self._compute(kwargs)
+                self._put(key, captured)
+            else:
+                self.num_hits += 1
+            self._prefetched.clear()
+
+        captured.show()
+        if self.prefetch and self._returns_output and key is not None:
+            threading.Thread(
+                target=self._prefetch,
+                args=(self._generation, self._get_neighbors(kwargs)),
+                daemon=True,
+            ).start()
+
+    @staticmethod
+    def _get_key(kwargs: dict[str, Any]) -> Hashable | None:
+        key = tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            # E.g., list values, which aren't memoized
+            return None
+
+        return key
+
+    def _get(
+        self, key: Hashable | None
+    ) -> IPython.utils.capture.CapturedIO | None:
+        if key is None or key not in self._outputs:
+            return None
+
+        self._outputs.move_to_end(key)
+        return self._outputs[key][0]
+
+    def _put(
+        self, key: Hashable | None, captured: IPython.utils.capture.CapturedIO
+    ) -> None:
+        num_bytes = _get_num_bytes(captured)
+        if key is None or num_bytes > self.max_bytes:
+            return
+
+        self._outputs[key] = (captured, num_bytes)
+        self._num_bytes += num_bytes
+        while self._num_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._outputs.popitem(last=False)
+            self._num_bytes -= evicted_bytes
+
+    def _compute(
+        self, kwargs: dict[str, Any]
+    ) -> IPython.utils.capture.CapturedIO:
+        # Same as `ipywidgets.interactive.update()`
+        from ipywidgets.widgets.interaction import (
+            show_inline_matplotlib_plots,
+        )
+
+        captured: IPython.utils.capture.CapturedIO
+        with IPython.utils.capture.capture_output() as captured:
+            result = self.func(**kwargs)
+            show_inline_matplotlib_plots()
+            if self._returns_output is None:
+                self._returns_output = not (
+                    captured.stdout or captured.stderr or captured.outputs
+                )
+            if result is not None:
+                IPython.display.display(result)
+
+        return captured
+
+    @staticmethod
+    def _render(result: Any) -> IPython.utils.capture.CapturedIO:
+        captured: IPython.utils.capture.CapturedIO
+        with IPython.utils.capture.capture_output() as captured:
+            if result is not None:
+                IPython.display.display(result)
+
+        return captured
+
+    def _get_neighbors(self, kwargs: dict[str, Any]) -> list[dict[str, Any]]:
+        neighbors = []
+        for name, widget in self.widgets.items():
+            if name not in kwargs:
+                continue
+
+            for value in get_neighbor_values(widget):
+                neighbors.append({**kwargs, name: value})
+
+        return neighbors
+
+    def _prefetch(
+        self, generation: int, neighbors: list[dict[str, Any]]
+    ) -> None:
+        time.sleep(self.prefetch_delay_secs)
+        for kwargs in neighbors:
+            with self._lock:
+                if self._generation != generation:
+                    return
+
+                key = self._get_key(kwargs)
+                if key in self._outputs or key in self._prefetched:
+                    continue
+
+                # NB: Don't capture output on this thread, since it would
+                # also capture the output of other cells.
+                try:
+                    self._prefetched[key] = self.func(**kwargs)
+                except Exception:
+                    logger.debug(
+                        "Failed to prefetch %s", kwargs, exc_info=True
+                    )
+
+
+@dataclasses.dataclass()
 class DynamicIpywidgetsInteractMode(leda.interacting.base.InteractMode):
+    # If set, memoize the outputs of states viewed (or prefetched) in memory,
+    # up to this size per interact, and replay them instead of calling the
+    # function again.
+    cache_max_mb: float | None = None
+    # If memoizing, prefetch the results of the states adjacent to the
+    # current one in a background thread once widgets haven't changed for
+    # this long (only for functions that return their output).
+    prefetch: bool = False
+    prefetch_delay_secs: float = 0.5
+
     @property
     @override
     def dynamic(self) -> bool:
@@ -41,8 +286,17 @@ class DynamicIpywidgetsInteractMode(leda.interacting.base.InteractMode):
     @override
     def interact(self, func: Callable, **kwargs: Any) -> Any:
         kwargs = to_dynamic_ipywidgets(kwargs)
+        if self.cache_max_mb is None:
+            return ipywidgets.interact(func, **kwargs)
 
-        return ipywidgets.interact(func, **kwargs)
+        memoized_func = MemoizedFunction(
+            func,
+            kwargs,
+            max_bytes=int(self.cache_max_mb * 2**20),
+            prefetch=self.prefetch,
+            prefetch_delay_secs=self.prefetch_delay_secs,
+        )
+        return ipywidgets.interact(memoized_func.get_function(), **kwargs)
 
     @override
     def process_result(self, obj: Any) -> Any:
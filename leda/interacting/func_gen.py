@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import hashlib
 import textwrap
 from typing import Any, Callable, Mapping
-import uuid
 
 import IPython
 
@@ -29,7 +29,11 @@ def gen_func_cell(
     cell: str, kwargs: Mapping[str, Any], func_name: str | None = None
 ) -> tuple[str, str]:
     if not func_name:
-        unique_id = uuid.uuid4().hex[:10]
+        # Deterministic so that, e.g., cached interact outputs can be
+        # reused across runs.
+        unique_id = hashlib.sha256(
+            repr((cell, list(kwargs))).encode()
+        ).hexdigest()[:10]
         func_name = f"func_{unique_id}"
 
     arg_names = ", ".join(kwargs.keys())
@@ -31,12 +31,17 @@ except NameError:
 
 
 def _interact(line: str, cell: str) -> Any:
-    kwargs = leda.interacting.func_gen.gen_kwargs(line)
+    kwargs = dict(leda.interacting.func_gen.gen_kwargs(line))
+    # Not a widget, so not an arg of the generated function.
+    constraint = kwargs.pop("constraint", None)
+
     func_name, func_cell = leda.interacting.func_gen.gen_func_cell(
         cell, kwargs
     )
     func = leda.interacting.func_gen.gen_func(func_name, func_cell)
-    return leda.interacting.core.get_interact_mode().interact(func, **kwargs)
+    return leda.interacting.core.interact(
+        func, constraint=constraint, **kwargs
+    )
 
 
 @register_line_cell_magic
@@ -1,10 +1,187 @@
 import dataclasses
+import functools
+import itertools
+import logging
+import math
+import pathlib
+import pickle
 import sys
-from typing import Any, Callable, Optional
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from typing_extensions import override
 
 import leda.interacting.base
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    executors,
+    preflight,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# If set, write the embedded states of interacts as JSON files under this
+# dir, which the browser fetches as they're needed, instead of inlining
+# them in the report. Note that browsers only fetch these over HTTP(S),
+# not from `file://` URLs.
+STATE_DIR: Optional[str] = None
+# URL of `STATE_DIR` relative to the report.
+STATE_URL = "states"
+# If set, estimate the cost of the embedded states of every interact from
+# a sample of states, and enforce this budget (see `preflight`).
+BUDGET: Optional[preflight.Budget] = None
+# If set, precompute the results of all embedded states with this executor
+# (e.g., on forked worker processes) before panel embeds them, instead of
+# panel calling the function for every state in turn.
+EXECUTOR: Optional[executors.Executor] = None
+
+# Only panel's warning threshold without a budget.
+DEFAULT_MAX_STATES = 500
+# Max number of values of each (continuous) slider.
+MAX_OPTS = 500
+
+_STATE_PREFIX = "leda"
+
+
+def _get_embed_values(widget: Any) -> Optional[List[Any]]:
+    """Get values of widget that panel embeds, or `None` if not embedded."""
+    import numpy as np
+
+    if hasattr(widget, "values"):
+        # E.g., select widgets and discrete sliders
+        return list(widget.values)
+    elif all(hasattr(widget, attr) for attr in ("start", "end", "step")):
+        # Same sampling as panel
+        start, end, step = widget.start, widget.end, widget.step
+        dtype = int if isinstance(step, int) else float
+        if (end - start) / step > MAX_OPTS - 1:
+            step = dtype((end - start) / (MAX_OPTS - 1))
+        # NB: `np.arange()` may overshoot `end` (e.g., 1.3000000000000003
+        # for `(1.0, 1.2, 0.1)`), which panel rejects in `states`, or round
+        # the last value slightly past it.
+        tolerance = abs(step) * 1e-6
+        return [
+            dtype(min(value, end))
+            for value in np.arange(start, end + step, step)
+            if value <= end + tolerance
+        ]
+    elif isinstance(widget.value, bool):
+        return [False, True]
+
+    return None
+
+
+def _get_default_position(widget: Any, values: List[Any]) -> int:
+    if widget.value in values:
+        return values.index(widget.value)
+
+    # E.g., slider value between sampled values
+    try:
+        return min(
+            range(len(values)),
+            key=lambda pos: abs(values[pos] - widget.value),
+        )
+    except TypeError:
+        return 0
+
+
+class _PrecomputedFunction:
+    """Wrapper of interact function that looks up precomputed results.
+
+    Results are pickled by the executor and only unpickled when panel calls
+    the function for their state. States without a result (e.g., not
+    picklable) are computed as usual.
+    """
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+
+        # Arguments of the first (i.e., default) call, including fixed
+        # arguments
+        self.default_kwargs: Optional[Dict[str, Any]] = None
+        # Widget name -> values, and positions of values -> pickled result
+        self._values_by_name: Dict[str, List[Any]] = {}
+        self._results: Dict[Tuple[int, ...], bytes] = {}
+
+    def __call__(self, **kwargs: Any) -> Any:
+        if self.default_kwargs is None:
+            self.default_kwargs = dict(kwargs)
+
+        result = self._results.get(self._get_key(kwargs))
+        if result is not None:
+            return pickle.loads(result)
+
+        return self.func(**kwargs)
+
+    def get_function(self) -> Callable:
+        """Get function for panel, with the signature of the wrapped one."""
+
+        @functools.wraps(self.func)
+        def wrapper(**kwargs: Any) -> Any:
+            return self(**kwargs)
+
+        return wrapper
+
+    def _get_key(self, kwargs: Dict[str, Any]) -> Tuple[int, ...]:
+        try:
+            return tuple(
+                values.index(kwargs[name])
+                for name, values in self._values_by_name.items()
+            )
+        except (KeyError, ValueError):
+            return ()
+
+    def _compute(self, call_kwargs: Dict[str, Any]) -> Optional[bytes]:
+        result = self.func(**call_kwargs)
+        try:
+            return pickle.dumps(result)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+
+    def precompute(
+        self,
+        values_by_name: Dict[str, List[Any]],
+        executor: executors.Executor,
+    ) -> None:
+        """Compute results of all combinations of widget values."""
+        assert self.default_kwargs is not None, "Only call after default"
+        self._values_by_name = values_by_name
+        default_kwargs = self.default_kwargs
+        names = list(values_by_name)
+        keys: List[Sequence[int]] = list(
+            itertools.product(
+                *(range(len(values)) for values in values_by_name.values())
+            )
+        )
+
+        # Only pass indices to the executor so that widget values never
+        # need to be pickled.
+        def compute(idx: int) -> Optional[bytes]:
+            return self._compute(
+                {
+                    **default_kwargs,
+                    **{
+                        name: values_by_name[name][pos]
+                        for name, pos in zip(names, keys[idx])
+                    },
+                }
+            )
+
+        start_time = time.perf_counter()
+        for key, result in zip(keys, executor.map(compute, range(len(keys)))):
+            if result is not None:
+                self._results[tuple(key)] = result
+
+        logger.info(
+            "Precomputed %s of %s states in %.2fs",
+            len(self._results),
+            len(keys),
+            time.perf_counter() - start_time,
+        )
+
+    def clear(self) -> None:
+        self._results.clear()
 
 
 @dataclasses.dataclass()
@@ -64,10 +241,167 @@ class StaticPanelInteractMode(leda.interacting.base.InteractMode):
                     "*before* calling leda.init())"
                 )
 
-        interact_view = pn.interact(func, **kwargs)
-        return interact_view.embed(  # pyright: ignore
-            max_states=500, max_opts=500, progress=self.progress
+        precomputed_func = _PrecomputedFunction(func)
+        interact_view = pn.interact(precomputed_func.get_function(), **kwargs)
+        states = (
+            self._get_budgeted_states(func, kwargs, interact_view, BUDGET)
+            if BUDGET is not None
+            else {}
+        )
+        if EXECUTOR is not None:
+            # NB: Pass the values of every widget to panel, so that it
+            # embeds exactly the precomputed states.
+            states = states or {
+                widget: _get_embed_values(widget) or []
+                for widget in self._get_widgets(interact_view)
+            }
+            precomputed_func.precompute(
+                {widget.name: values for widget, values in states.items()},
+                EXECUTOR,
+            )
+
+        try:
+            return interact_view.embed(  # pyright: ignore
+                max_states=(
+                    math.prod(len(values) for values in states.values())
+                    if states
+                    else DEFAULT_MAX_STATES
+                ),
+                max_opts=MAX_OPTS,
+                progress=self.progress,
+                states=states,
+                **self._get_json_kwargs(STATE_DIR),
+            )
+        finally:
+            precomputed_func.clear()
+
+    @staticmethod
+    def _get_json_kwargs(state_dir: Optional[str]) -> Dict[str, Any]:
+        if state_dir is None:
+            return {}
+
+        return {
+            "json": True,
+            "json_prefix": _STATE_PREFIX,
+            "save_path": state_dir,
+            "load_path": STATE_URL,
+        }
+
+    @staticmethod
+    def _get_widgets(interact_view: Any) -> List[Any]:
+        import panel as pn
+
+        # NB: The first item of the layout is the box of widgets.
+        return [
+            widget
+            for widget in interact_view[0].objects
+            if isinstance(widget, pn.widgets.Widget)
+            and _get_embed_values(widget) is not None
+        ]
+
+    def _estimate(
+        self,
+        func: Callable,
+        kwargs: Dict[str, Any],
+        num_states: int,
+        budget: preflight.Budget,
+    ) -> preflight.Estimate:
+        """Estimate cost of states by embedding a sample of them."""
+        import panel as pn
+
+        jobs = getattr(EXECUTOR, "jobs", 1)
+        if not budget.needs_sample or num_states <= budget.sample_size:
+            return preflight.Estimate(num_states, 0, 0.0, 0.0, jobs=jobs)
+
+        # Vary the widget with the most values, and keep the others at
+        # their defaults.
+        sample_view = pn.interact(func, **kwargs)
+        widgets = self._get_widgets(sample_view)
+        values = [_get_embed_values(widget) or [] for widget in widgets]
+        varied_idx = max(range(len(widgets)), key=lambda idx: len(values[idx]))
+        states = {}
+        for idx, (widget, widget_values) in enumerate(zip(widgets, values)):
+            default_pos = _get_default_position(widget, widget_values)
+            positions = (
+                preflight.get_sample(
+                    len(widget_values), default_pos, budget.sample_size
+                )
+                if idx == varied_idx
+                else [default_pos]
+            )
+            states[widget] = [widget_values[pos] for pos in positions]
+
+        with tempfile.TemporaryDirectory(prefix="leda_panel_") as tmp_dir:
+            start_time = time.perf_counter()
+            sample_view.embed(  # pyright: ignore
+                max_states=budget.sample_size,
+                max_opts=MAX_OPTS,
+                states=states,
+                **self._get_json_kwargs(tmp_dir),
+            )
+            secs = time.perf_counter() - start_time
+            sizes = [
+                path.stat().st_size
+                for path in pathlib.Path(tmp_dir).rglob("*.json")
+            ]
+
+        num_sampled = max(len(sizes), 1)
+        return preflight.Estimate(
+            num_states=num_states,
+            num_sampled=num_sampled,
+            secs_per_state=secs / num_sampled,
+            bytes_per_state=sum(sizes) / num_sampled,
+            jobs=jobs,
+        )
+
+    def _get_budgeted_states(
+        self,
+        func: Callable,
+        kwargs: Dict[str, Any],
+        interact_view: Any,
+        budget: preflight.Budget,
+    ) -> Dict[Any, List[Any]]:
+        """Get values to embed of every widget, or empty for all values."""
+        widgets = self._get_widgets(interact_view)
+        values = [_get_embed_values(widget) or [] for widget in widgets]
+        radices = [len(widget_values) for widget_values in values]
+        num_states = math.prod(radices)
+
+        estimate = self._estimate(func, kwargs, num_states, budget)
+        if estimate.num_sampled:
+            logger.info("Estimated %s", estimate)
+
+        max_states = estimate.get_max_states(budget)
+        if max_states is None or num_states <= max_states:
+            return {}
+
+        message = f"Interact is over budget ({budget}): estimated {estimate}"
+        if budget.over_budget == preflight.FAIL:
+            raise ValueError(message)
+
+        default_positions = [
+            _get_default_position(widget, widget_values)
+            for widget, widget_values in zip(widgets, values)
+        ]
+        if budget.over_budget == preflight.DEFAULT_ONLY:
+            kept_positions = [{pos} for pos in default_positions]
+        else:
+            kept_positions = preflight.subsample_grid(
+                radices, default_positions, max_states
+            )
+
+        logger.warning(
+            "%s; falling back to %s of %s states",
+            message,
+            math.prod(len(kept) for kept in kept_positions),
+            num_states,
         )
+        return {
+            widget: [widget_values[pos] for pos in sorted(kept)]
+            for widget, widget_values, kept in zip(
+                widgets, values, kept_positions
+            )
+        }
 
     @override
     def process_result(self, obj: Any) -> Any:
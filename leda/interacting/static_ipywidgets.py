@@ -1,11 +1,12 @@
 import dataclasses
 import html
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional
 
 import ipywidgets
 from typing_extensions import override
 
 import leda.interacting.base
+import leda.interacting.constraints
 import leda.interacting.dynamic
 from leda.vendor.static_ipywidgets import static_ipywidgets
 
@@ -32,8 +33,10 @@ class StaticIpywidgetsInteractMode(leda.interacting.base.InteractMode):
             raise ValueError(self._plot_lib)
 
     # noinspection PyProtectedMember
-    @override
-    def interact(self, func: Callable, **kwargs: Any) -> Any:
+    @staticmethod
+    def _to_static_widgets(
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
         new_value: static_ipywidgets.widgets.StaticWidget
 
         kwargs = dict(leda.interacting.dynamic.to_dynamic_ipywidgets(kwargs))
@@ -58,7 +61,27 @@ class StaticIpywidgetsInteractMode(leda.interacting.base.InteractMode):
 
             kwargs[key] = new_value
 
-        return static_ipywidgets.interact.StaticInteract(func, **kwargs)
+        return kwargs
+
+    @override
+    def interact(self, func: Callable, **kwargs: Any) -> Any:
+        return static_ipywidgets.interact.StaticInteract(
+            func, **self._to_static_widgets(kwargs)
+        )
+
+    @override
+    def interact_constrained(
+        self,
+        func: Callable,
+        constraint: leda.interacting.constraints.Constraint,
+        **kwargs: Any,
+    ) -> Any:
+        # Only compute (and store) admissible states.
+        return static_ipywidgets.interact.StaticInteract(
+            func,
+            constraint=constraint.is_valid,
+            **self._to_static_widgets(kwargs),
+        )
 
     @override
     def process_result(self, obj: Any) -> Any:
@@ -0,0 +1,449 @@
+"""Run benchmarks of static interacts and report generation.
+
+Benchmarks are synthetic interacts over a grid of widget values, with one
+kind of output per benchmark (e.g., matplotlib PNGs or plotly figures), as
+well as end-to-end generation of a report with such an interact. Each
+benchmark runs in a fresh process, which reports the best wall time over
+the repeats, the bytes produced, and the peak RSS (including any kernel).
+
+Results are compared against a stored baseline, and this exits with an
+error if any result regressed beyond the tolerances. Note that wall time
+and RSS depend on the machine, so refresh the baseline (with
+`--save-baseline`) when switching machines.
+
+E.g.:
+
+```bash
+# Compare against baseline.
+python ./leda/tests/benchmarks/run_benchmarks.py --log INFO
+
+# Only plotly benchmarks, on a larger grid.
+python ./leda/tests/benchmarks/run_benchmarks.py -k plotly --grid 20x10
+
+# Save new baseline.
+python ./leda/tests/benchmarks/run_benchmarks.py --save-baseline
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baseline.json"
+
+OUTPUT_KINDS = (
+    "matplotlib",
+    "plotly",
+    "plotly_html",
+    "dataframe",
+    "markdown",
+)
+
+DEFAULT_GRID = (10, 4)
+DEFAULT_REPEAT = 3
+
+# Results regress if they're more than these ratios of the baseline...
+TOLERANCES = {
+    "wall_secs": 1.25,
+    "output_bytes": 1.05,
+    "peak_rss_bytes": 1.2,
+}
+# ...and differ by more than these, which are within noise.
+MIN_DELTAS = {
+    "wall_secs": 0.05,
+    "output_bytes": 1024,
+    "peak_rss_bytes": 16 * 2**20,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Benchmark:
+    # "interact" or "report"
+    target: str
+    kind: str
+    grid: tuple[int, int]
+
+    @property
+    def name(self) -> str:
+        return f"{self.target}-{self.kind}-{self.grid[0]}x{self.grid[1]}"
+
+
+@dataclasses.dataclass(frozen=True)
+class Result:
+    name: str
+    # Best over repeats
+    wall_secs: float
+    output_bytes: int
+    # `None` if not available on the platform
+    peak_rss_bytes: int | None
+
+
+def make_output(kind: str, x: int, y: int) -> Any:
+    """Make output of a synthetic interact for one state."""
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(
+        np.random.RandomState(x * 1000 + y).randn(200, 4).cumsum(axis=0),
+        columns=list("abcd"),
+    )
+    if kind == "matplotlib":
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=(6, 4))
+        df.plot(ax=ax, title=f"x={x}, y={y}")
+        return fig
+    elif kind in ("plotly", "plotly_html"):
+        import plotly.graph_objects as go
+
+        return go.Figure(
+            data=[
+                go.Scatter(x=df.index, y=df[column], name=column)
+                for column in df.columns
+            ],
+            layout={"title": f"x={x}, y={y}"},
+        )
+    elif kind == "dataframe":
+        return df.describe()
+    elif kind == "markdown":
+        import IPython.display
+
+        lines = [
+            f"### x={x}, y={y}",
+            "",
+            "| " + " | ".join(df.columns) + " |",
+            "|" + "---:|" * len(df.columns),
+        ]
+        for row in df.head(20).itertuples(index=False):
+            lines.append("| " + " | ".join(f"{v:.3f}" for v in row) + " |")
+        return IPython.display.Markdown("\n".join(lines))
+    else:
+        raise ValueError(f"Unknown output kind: {kind!r}")
+
+
+def _set_up_ipython() -> None:
+    """Set up IPython shell with PNG figures, as in a notebook."""
+    import matplotlib
+
+    matplotlib.use("agg")
+
+    from IPython.core import interactiveshell, pylabtools
+
+    shell = interactiveshell.InteractiveShell.instance()
+    pylabtools.select_figure_formats(shell, {"png"})
+
+
+def _run_interact(benchmark: Benchmark) -> int:
+    from leda.vendor.static_ipywidgets.static_ipywidgets import (
+        interact,
+        widgets,
+    )
+
+    interact.SHARE_PLOTLY_STRUCTURE = benchmark.kind != "plotly_html"
+    static_interact = interact.StaticInteract(
+        lambda x, y: make_output(benchmark.kind, x, y),
+        x=widgets.DropDownWidget(list(range(benchmark.grid[0]))),
+        y=widgets.DropDownWidget(list(range(benchmark.grid[1]))),
+    )
+    return len(static_interact.html().encode())
+
+
+def make_report_nb(benchmark: Benchmark) -> Any:
+    """Make notebook with synthetic interact."""
+    import nbformat
+
+    plot_lib = "matplotlib" if benchmark.kind == "matplotlib" else "plotly"
+    setup_source = (
+        "import leda\n"
+        "from leda.tests.benchmarks import run_benchmarks\n"
+        "\n"
+        f"leda.init({plot_lib!r})"
+    )
+    if benchmark.kind == "plotly_html":
+        setup_source += (
+            "\n\n"
+            "from leda.vendor.static_ipywidgets.static_ipywidgets import "
+            "interact\n"
+            "\n"
+            "interact.SHARE_PLOTLY_STRUCTURE = False"
+        )
+
+    return nbformat.v4.new_notebook(
+        cells=[
+            nbformat.v4.new_code_cell(setup_source),
+            nbformat.v4.new_code_cell(
+                f"%%interact x=list(range({benchmark.grid[0]}));"
+                f"y=list(range({benchmark.grid[1]}))\n"
+                f"run_benchmarks.make_output({benchmark.kind!r}, x, y)"
+            ),
+        ]
+    )
+
+
+def _get_dir_bytes(dir_path: pathlib.Path) -> int:
+    return sum(
+        path.stat().st_size for path in dir_path.rglob("*") if path.is_file()
+    )
+
+
+def _run_report(benchmark: Benchmark) -> int:
+    import nbformat
+
+    import leda
+
+    with tempfile.TemporaryDirectory(prefix="leda_benchmark_") as tmp_dir:
+        nb_path = pathlib.Path(tmp_dir) / f"{benchmark.name}.ipynb"
+        nbformat.write(make_report_nb(benchmark), nb_path)
+        output_dir = pathlib.Path(tmp_dir) / "output"
+        runner = leda.MainReportRunner(
+            modifier=leda.StaticIpywidgetsReportModifier(local_dir_path=None),
+            generator=leda.MainStaticReportGenerator(progress=False),
+            publisher=leda.FileReportPublisher(output_dir=output_dir),
+        )
+        runner.run(report=leda.FileReport(nb_path=nb_path, name="benchmark"))
+        return _get_dir_bytes(output_dir)
+
+
+def _get_peak_rss_bytes() -> int | None:
+    """Get peak RSS of this process and its terminated children."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # NB: In KB on Linux, but bytes on macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    return unit * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def measure(benchmark: Benchmark, repeat: int = DEFAULT_REPEAT) -> Result:
+    """Run benchmark in this process."""
+    _set_up_ipython()
+    run = _run_interact if benchmark.target == "interact" else _run_report
+
+    wall_secs = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        output_bytes = run(benchmark)
+        wall_secs.append(time.perf_counter() - start_time)
+
+    return Result(
+        name=benchmark.name,
+        wall_secs=min(wall_secs),
+        output_bytes=output_bytes,
+        peak_rss_bytes=_get_peak_rss_bytes(),
+    )
+
+
+def measure_isolated(
+    benchmark: Benchmark, repeat: int = DEFAULT_REPEAT
+) -> Result:
+    """Run benchmark in a fresh process, so peak RSS is its own."""
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(measure, benchmark, repeat).result()
+
+
+def get_benchmarks(
+    grid: tuple[int, int], pattern: str | None = None, reports: bool = True
+) -> list[Benchmark]:
+    targets = ["interact", "report"] if reports else ["interact"]
+    return [
+        benchmark
+        for target in targets
+        for kind in OUTPUT_KINDS
+        for benchmark in [Benchmark(target=target, kind=kind, grid=grid)]
+        if pattern is None or pattern in benchmark.name
+    ]
+
+
+def compare(
+    result: Result, baseline: dict[str, Any] | None
+) -> tuple[list[str], list[str]]:
+    """Compare result against its baseline.
+
+    Returns:
+        Formatted changes of all metrics, and names of regressed metrics.
+    """
+    changes = []
+    regressions = []
+    for metric, tolerance in TOLERANCES.items():
+        value = getattr(result, metric)
+        base_value = (baseline or {}).get(metric)
+        if value is None or base_value is None:
+            changes.append("")
+            continue
+
+        changes.append(
+            f"{value / base_value - 1:+.0%}" if base_value else "n/a"
+        )
+        if (
+            value > tolerance * base_value
+            and value - base_value > MIN_DELTAS[metric]
+        ):
+            regressions.append(metric)
+
+    return changes, regressions
+
+
+def _format_result(result: Result, changes: Sequence[str]) -> str:
+    rss_mb = (
+        f"{result.peak_rss_bytes / 2**20:.0f}"
+        if result.peak_rss_bytes is not None
+        else ""
+    )
+    return (
+        f"{result.name:<32} {result.wall_secs:>9.3f} {changes[0]:>6} "
+        f"{result.output_bytes / 2**10:>10.1f} {changes[1]:>6} "
+        f"{rss_mb:>8} {changes[2]:>6}"
+    )
+
+
+def load_baseline(path: pathlib.Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        logger.warning("No baseline at %s", path)
+        return {}
+
+    with path.open() as fh:
+        baseline: dict[str, dict[str, Any]] = json.load(fh)["benchmarks"]
+
+    return baseline
+
+
+def save_baseline(results: Sequence[Result], path: pathlib.Path) -> None:
+    # Keep baselines of benchmarks that weren't run.
+    benchmarks = load_baseline(path) if path.exists() else {}
+    for result in results:
+        benchmarks[result.name] = {
+            key: value
+            for key, value in dataclasses.asdict(result).items()
+            if key != "name"
+        }
+
+    with path.open("w") as fh:
+        json.dump(
+            {
+                "machine": {
+                    "platform": platform.platform(),
+                    "python": platform.python_version(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "benchmarks": dict(sorted(benchmarks.items())),
+            },
+            fh,
+            indent=2,
+        )
+        fh.write("\n")
+
+    logger.info("Saved baseline of %s benchmarks to %s", len(results), path)
+
+
+def run_benchmarks(
+    benchmarks: Sequence[Benchmark],
+    baseline_path: pathlib.Path,
+    repeat: int = DEFAULT_REPEAT,
+    save: bool = False,
+) -> bool:
+    """Run benchmarks and print results.
+
+    Returns:
+        Whether no result regressed.
+    """
+    baseline = load_baseline(baseline_path)
+
+    print(
+        f"{'Benchmark':<32} {'Wall (s)':>9} {'':>6} {'Output (KB)':>10} "
+        f"{'':>6} {'RSS (MB)':>8} {'':>6}"
+    )
+    results = []
+    ok = True
+    for benchmark in benchmarks:
+        result = measure_isolated(benchmark, repeat=repeat)
+        results.append(result)
+        changes, regressions = compare(result, baseline.get(result.name))
+        print(_format_result(result, changes), flush=True)
+        if regressions:
+            logger.error(
+                "%s regressed in %s", result.name, ", ".join(regressions)
+            )
+            ok = False
+
+    if save:
+        save_baseline(results, baseline_path)
+
+    return ok
+
+
+def _parse_grid(grid_str: str) -> tuple[int, int]:
+    """Parse grid size.
+
+    >>> _parse_grid("10x4")
+    (10, 4)
+    """
+    num_xs, num_ys = grid_str.lower().split("x")
+    return int(num_xs), int(num_ys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-k",
+        dest="pattern",
+        help="Only run benchmarks whose names contain this",
+    )
+    parser.add_argument(
+        "--grid",
+        type=_parse_grid,
+        default=DEFAULT_GRID,
+        help="Number of values of the two widgets, e.g., 10x4",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--no-reports",
+        action="store_true",
+        help="Skip end-to-end report generation",
+    )
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save results as the new baseline",
+    )
+    parser.add_argument("--log")
+    args = parser.parse_args()
+
+    if args.log:
+        logging.basicConfig(level=args.log.upper())
+
+    # Don't mix progress bars into the results.
+    os.environ.setdefault("TQDM_DISABLE", "1")
+
+    benchmarks = get_benchmarks(
+        args.grid, pattern=args.pattern, reports=not args.no_reports
+    )
+    if not run_benchmarks(
+        benchmarks, args.baseline, repeat=args.repeat, save=args.save_baseline
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import pathlib
+
+import leda.gen.assets
+
+
+def test_externalize_assets(tmp_path: pathlib.Path) -> None:
+    css = "body { color: red; }\n" * 100
+    head = (
+        "<head>"
+        f'<style type="text/css">{css}</style>'
+        "<style>.small {}</style>"
+        '<script type="text/x-mathjax-config">'
+        f"{'x' * 2000}"
+        "</script>"
+        "</head>"
+    )
+
+    new_head = leda.gen.assets.externalize_assets(head, tmp_path, "../assets")
+
+    (path,) = tmp_path.iterdir()
+    assert path.suffix == ".css"
+    assert path.read_text() == css
+    assert f'href="../assets/{path.name}"' in new_head
+    # Too small or not JS
+    assert "<style>.small {}</style>" in new_head
+    assert "text/x-mathjax-config" in new_head
+
+    # Same assets for the same content
+    assert (
+        leda.gen.assets.externalize_assets(head, tmp_path, "../assets")
+        == new_head
+    )
+    assert len(list(tmp_path.iterdir())) == 1
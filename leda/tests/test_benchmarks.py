@@ -0,0 +1,36 @@
+import pathlib
+
+from leda.tests.benchmarks import run_benchmarks
+
+
+def test_run_benchmarks(tmp_path: pathlib.Path) -> None:
+    benchmarks = run_benchmarks.get_benchmarks(
+        (2, 2), pattern="interact-markdown"
+    )
+    assert [benchmark.name for benchmark in benchmarks] == [
+        "interact-markdown-2x2"
+    ]
+
+    baseline_path = tmp_path / "baseline.json"
+    assert run_benchmarks.run_benchmarks(
+        benchmarks, baseline_path, repeat=1, save=True
+    )
+    baseline = run_benchmarks.load_baseline(baseline_path)
+    assert baseline["interact-markdown-2x2"]["output_bytes"] > 0
+
+
+def test_compare() -> None:
+    result = run_benchmarks.Result(
+        name="interact-markdown-2x2",
+        wall_secs=2.0,
+        output_bytes=1000,
+        peak_rss_bytes=None,
+    )
+    changes, regressions = run_benchmarks.compare(
+        result,
+        {"wall_secs": 1.0, "output_bytes": 990, "peak_rss_bytes": 2**30},
+    )
+    assert changes == ["+100%", "+1%", ""]
+    assert regressions == ["wall_secs"]
+
+    assert run_benchmarks.compare(result, None) == (["", "", ""], [])
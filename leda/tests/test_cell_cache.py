@@ -0,0 +1,55 @@
+import pathlib
+
+import nbformat
+import pytest
+
+import leda.gen.cell_cache
+import leda.gen.generators
+
+
+def _gen_nb(last_source: str, title: str) -> nbformat.NotebookNode:
+    nb_contents: nbformat.NotebookNode = nbformat.v4.new_notebook()
+    nb_contents.cells = [
+        nbformat.v4.new_code_cell("import random\n\nx = random.random()"),
+        nbformat.v4.new_markdown_cell(f"# {title}"),
+        nbformat.v4.new_code_cell(last_source),
+    ]
+    return nb_contents
+
+
+def _run(
+    nb_contents: nbformat.NotebookNode,
+    cache_dir: pathlib.Path,
+    checkpoints: bool = False,
+) -> str:
+    generator = leda.gen.generators.MainStaticReportGenerator(
+        cell_cache=leda.gen.cell_cache.CellExecutionCache(
+            str(cache_dir), checkpoints=checkpoints
+        )
+    )
+    generator.generate(nb_contents)
+    return str(nb_contents.cells[-1].outputs[0]["text"])
+
+
+def test_cell_cache(tmp_path: pathlib.Path) -> None:
+    x_str = _run(_gen_nb("print(x)", "Foo"), tmp_path)
+
+    # Only markdown changed, so everything is replayed.
+    assert _run(_gen_nb("print(x)", "Bar"), tmp_path) == x_str
+
+    # Without checkpoints, everything is executed again.
+    assert _run(_gen_nb("print(x, 1)", "Bar"), tmp_path) != (
+        f"{x_str[:-1]} 1\n"
+    )
+
+
+def test_cell_cache_checkpoints(tmp_path: pathlib.Path) -> None:
+    pytest.importorskip("dill")
+
+    x_str = _run(_gen_nb("print(x)", "Foo"), tmp_path, checkpoints=True)
+
+    # The kernel namespace is restored from after the first cell.
+    assert (
+        _run(_gen_nb("print(x, 1)", "Foo"), tmp_path, checkpoints=True)
+        == f"{x_str[:-1]} 1\n"
+    )
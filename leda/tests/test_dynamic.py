@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import List, Tuple
+
+import ipywidgets
+import pytest
+
+import leda.interacting.dynamic
+
+
+def test_memoized_function(capsys: pytest.CaptureFixture[str]) -> None:
+    calls: List[Tuple[int, str]] = []
+
+    def func(x: int, y: str) -> None:
+        calls.append((x, y))
+        print(f"{x} {y}")
+
+    widgets = leda.interacting.dynamic.to_dynamic_ipywidgets(
+        {"x": (0, 3), "y": ["a", "b"]}
+    )
+    memoized_func = leda.interacting.dynamic.MemoizedFunction(
+        func, widgets, max_bytes=8
+    )
+    for x in [0, 1, 0, 2, 0, 1]:
+        memoized_func(x=x, y="a")
+
+    # Each output is 4 bytes, so only the 2 most recent states are kept.
+    assert calls == [(0, "a"), (1, "a"), (2, "a"), (1, "a")]
+    assert capsys.readouterr().out.split("\n")[:-1] == [
+        f"{x} a" for x in [0, 1, 0, 2, 0, 1]
+    ]
+
+    # Functions that print their output are never prefetched.
+    calls.clear()
+    memoized_func.prefetch = True
+    memoized_func.prefetch_delay_secs = 0.0
+    memoized_func(x=3, y="a")
+    time.sleep(0.1)
+    assert calls == [(3, "a")]
+
+
+def test_memoized_function_prefetch(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    calls: List[Tuple[int, str]] = []
+    prefetching = threading.Event()
+    main_printed = threading.Event()
+
+    def func(x: int, y: str) -> str:
+        calls.append((x, y))
+        if threading.current_thread() is not threading.main_thread():
+            # Prefetch while the main thread prints, e.g., in another cell
+            prefetching.set()
+            assert main_printed.wait(5)
+
+        return f"{x} {y}"
+
+    widgets = leda.interacting.dynamic.to_dynamic_ipywidgets(
+        {"x": (0, 3), "y": ["a", "b"]}
+    )
+    memoized_func = leda.interacting.dynamic.MemoizedFunction(
+        func, widgets, max_bytes=2**20, prefetch=True, prefetch_delay_secs=0.0
+    )
+    widgets["x"].value = 1
+    memoized_func(x=1, y="a")
+    assert prefetching.wait(5)
+    print("main")
+    main_printed.set()
+    deadline = time.time() + 5
+    while len(calls) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+
+    # Neighbors of the current state
+    assert calls == [(1, "a"), (0, "a"), (2, "a"), (1, "b")]
+    # Only the results of prefetches are kept, and rendered once shown.
+    memoized_func(x=2, y="a")
+    assert len(calls) == 4
+    assert memoized_func.num_hits == 1
+    assert capsys.readouterr().out.split("\n")[:-1] == [
+        "1 a",
+        "main",
+        "2 a",
+    ]
+
+
+def test_get_neighbor_values() -> None:
+    assert leda.interacting.dynamic.get_neighbor_values(
+        ipywidgets.FloatSlider(value=0.2, min=0.0, max=1.0, step=0.1)
+    ) == [0.1, 0.3]
+    assert leda.interacting.dynamic.get_neighbor_values(
+        ipywidgets.Checkbox(value=False)
+    ) == [True]
@@ -0,0 +1,50 @@
+from typing import Any, Dict, List
+
+import pytest
+
+import leda.interacting.constraints
+
+
+def test_to_constraint() -> None:
+    constraint = leda.interacting.constraints.to_constraint(
+        lambda desk, region: desk != "B" or region == "asia"
+    )
+    assert constraint.is_valid({"desk": "A", "region": "us"})
+    assert not constraint.is_valid({"desk": "B", "region": "us"})
+
+    allowed_states: List[Dict[str, str]] = [
+        {"desk": "A"},
+        {"desk": "B", "region": "asia"},
+    ]
+    constraint = leda.interacting.constraints.to_constraint(allowed_states)
+    assert constraint.is_valid({"desk": "A", "region": "us"})
+    assert constraint.is_valid({"desk": "B", "region": "asia"})
+    assert not constraint.is_valid({"desk": "B", "region": "us"})
+
+    constraints: List[leda.interacting.constraints.ConstraintLike] = [
+        leda.interacting.constraints.DependentOptionsConstraint(
+            parent="desk", child="region", options={"A": ["us", "eu"]}
+        ),
+        lambda desk, region: region != "eu",
+    ]
+    constraint = leda.interacting.constraints.to_constraint(constraints)
+    assert constraint.is_valid({"desk": "A", "region": "us"})
+    assert not constraint.is_valid({"desk": "A", "region": "eu"})
+    assert not constraint.is_valid({"desk": "B", "region": "us"})
+
+    with pytest.raises(TypeError):
+        leda.interacting.constraints.to_constraint(123)  # type: ignore[arg-type]
+
+
+def test_mask_invalid_states() -> None:
+    def func(x: int, y: int) -> Any:
+        return x + y
+
+    masked_func = leda.interacting.constraints.mask_invalid_states(
+        func, leda.interacting.constraints.to_constraint(lambda x, y: x < y)
+    )
+    assert masked_func(x=1, y=2) == 3
+    assert (
+        masked_func(x=2, y=1).data
+        == leda.interacting.constraints.INVALID_STATE_MESSAGE
+    )
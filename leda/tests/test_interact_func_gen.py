@@ -64,3 +64,15 @@ def foo(foo_val, mult):
     return leda.get_interact_mode().process_result(fig)
 """
     )
+
+
+def test_gen_func_cell_name() -> None:
+    kwargs = {"foo_val": ["a", "b"], "mult": (1, 2)}
+    func_name = leda.interacting.func_gen.gen_func_cell("fig", kwargs)[0]
+    # Deterministic, so that interact outputs can be cached across runs.
+    assert leda.interacting.func_gen.gen_func_cell("fig", kwargs)[0] == (
+        func_name
+    )
+    assert leda.interacting.func_gen.gen_func_cell("fig2", kwargs)[0] != (
+        func_name
+    )
@@ -0,0 +1,90 @@
+import nbformat
+
+import leda.gen.generators
+import leda.gen.kernels
+import leda.gen.modifiers
+
+
+def _run(kernel_pool: leda.gen.kernels.KernelPool, source: str) -> str:
+    nb_contents: nbformat.NotebookNode = nbformat.v4.new_notebook()
+    nb_contents.cells = [nbformat.v4.new_code_cell(source)]
+
+    generator = leda.gen.generators.MainStaticReportGenerator(
+        kernel_pool=kernel_pool
+    )
+    generator.generate(nb_contents)
+    return str(nb_contents.cells[0].outputs[0]["text"])
+
+
+def test_kernel_pool() -> None:
+    source = """
+import os
+
+print(os.getpid(), "x" in globals())
+x = 1
+"""
+    with leda.gen.kernels.KernelPool(preload_modules=["json"]) as kernel_pool:
+        pid, has_x = _run(kernel_pool, source).split()
+        assert has_x == "False"
+
+        # Same kernel, with a clean namespace
+        assert _run(kernel_pool, source).split() == [pid, "False"]
+
+    with leda.gen.kernels.KernelPool(
+        preload_modules=["json"], max_uses=1
+    ) as kernel_pool:
+        pid, _ = _run(kernel_pool, source).split()
+        assert _run(kernel_pool, source).split()[0] != pid
+
+
+def _run_report(
+    kernel_pool: leda.gen.kernels.KernelPool,
+    modifier: leda.gen.modifiers.StaticIpywidgetsReportModifier,
+    source: str,
+) -> str:
+    nb_contents: nbformat.NotebookNode = nbformat.v4.new_notebook()
+    nb_contents.cells = [nbformat.v4.new_code_cell(source)]
+    modifier.modify(nb_contents)
+
+    generator = leda.gen.generators.MainStaticReportGenerator(
+        kernel_pool=kernel_pool
+    )
+    generator.generate(nb_contents)
+    (cell,) = [cell for cell in nb_contents.cells if cell.source == source]
+    return str(cell.outputs[0]["text"])
+
+
+def test_kernel_pool_options() -> None:
+    source = """
+from leda.vendor.static_ipywidgets.static_ipywidgets import interact, stats
+
+print(
+    interact.STREAMING,
+    interact.PLOTLY_SIGNIFICANT_DIGITS,
+    interact.SHARE_PLOTLY_STRUCTURE,
+    stats.STATS_HOOK,
+)
+interact.SHARE_PLOTLY_STRUCTURE = False
+stats.STATS_HOOK = print
+"""
+    with leda.gen.kernels.KernelPool() as kernel_pool:
+        options = _run_report(
+            kernel_pool,
+            leda.gen.modifiers.StaticIpywidgetsReportModifier(
+                local_dir_path=None,
+                streaming=True,
+                plotly_significant_digits=3,
+            ),
+            source,
+        )
+        assert options.split() == ["True", "3", "True", "None"]
+
+        # Same kernel, with every option reset
+        options = _run_report(
+            kernel_pool,
+            leda.gen.modifiers.StaticIpywidgetsReportModifier(
+                local_dir_path=None
+            ),
+            source,
+        )
+        assert options.split() == ["False", "None", "True", "None"]
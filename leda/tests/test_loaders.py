@@ -0,0 +1,26 @@
+import pathlib
+
+import leda
+import leda.gen.loaders
+
+
+def test_show_library_loaders(tmp_path: pathlib.Path) -> None:
+    library_urls = leda.gen.loaders.write_vendored_libraries(
+        tmp_path, "../assets"
+    )
+    assert len(list(tmp_path.iterdir())) == 3
+
+    jquery_url = library_urls[leda.gen.loaders.JQUERY]
+    assert jquery_url.startswith("../assets/")
+
+    try:
+        html = leda.gen.loaders.show_library_loaders(library_urls).data
+        assert f'src="{jquery_url}"' in html
+        # Already loaded
+        assert "<script\n  src=" not in leda.show_input_toggle().data
+    finally:
+        leda.gen.loaders._PAGE_LIBRARY_URLS.clear()
+
+    assert leda.gen.loaders.CDN_URLS[leda.gen.loaders.JQUERY] in (
+        leda.show_input_toggle().data
+    )
@@ -0,0 +1,104 @@
+import pathlib
+import re
+from typing import Any
+from unittest import mock
+
+import pytest
+
+import leda.interacting.panel
+from leda.vendor.static_ipywidgets.static_ipywidgets import (
+    executors,
+    preflight,
+)
+
+
+def func(x: int, y: str) -> Any:
+    import panel as pn
+
+    return pn.pane.Markdown(f"### {x} {y}\n\n" + "abc " * 100)
+
+
+def test_external_states(tmp_path: pathlib.Path) -> None:
+    pytest.importorskip("panel")
+
+    mode = leda.interacting.panel.StaticPanelInteractMode()
+    mode.init("plotly")
+    state_dir = tmp_path / "states"
+    with mock.patch.object(
+        leda.interacting.panel, "STATE_DIR", str(state_dir)
+    ), mock.patch.object(
+        leda.interacting.panel,
+        "BUDGET",
+        preflight.Budget(max_states=6, over_budget=preflight.SUBSAMPLE),
+    ):
+        mode.interact(func, x=list(range(10)), y=["a", "b"])
+
+    (embed_dir,) = state_dir.iterdir()
+    assert sorted(path.name for path in embed_dir.iterdir()) == [
+        f"{x}_{y}.json" for x in [0, 4, 8] for y in ["a", "b"]
+    ]
+
+    with mock.patch.object(
+        leda.interacting.panel, "BUDGET", preflight.Budget(max_states=6)
+    ), pytest.raises(ValueError, match="over budget"):
+        mode.interact(func, x=list(range(10)), y=["a", "b"])
+
+
+def test_float_slider_budget() -> None:
+    pytest.importorskip("panel")
+
+    mode = leda.interacting.panel.StaticPanelInteractMode()
+    mode.init("plotly")
+    # NB: The sampled values of the slider must not overshoot its end.
+    for budget in [
+        preflight.Budget(max_secs=100),
+        preflight.Budget(max_states=4, over_budget=preflight.SUBSAMPLE),
+    ]:
+        with mock.patch.object(leda.interacting.panel, "BUDGET", budget):
+            mode.interact(func, x=(1.0, 2.0, 0.1), y=["a", "b"])
+
+
+@pytest.mark.parametrize(
+    "x, num_states", [(list(range(3)), 6), ((1.0, 1.2, 0.1), 6)]
+)
+def test_precompute(tmp_path: pathlib.Path, x: Any, num_states: int) -> None:
+    pytest.importorskip("panel")
+
+    calls: list[tuple[Any, str]] = []
+
+    def counted_func(x: Any, y: str) -> Any:
+        calls.append((x, y))
+        return func(x, y)
+
+    mode = leda.interacting.panel.StaticPanelInteractMode()
+    mode.init("plotly")
+    texts_by_name: list[dict[str, str]] = []
+    num_calls: list[int] = []
+    for executor in [None, executors.ForkProcessExecutor(jobs=2)]:
+        state_dir = tmp_path / str(len(texts_by_name))
+        calls.clear()
+        with mock.patch.object(
+            leda.interacting.panel, "STATE_DIR", str(state_dir)
+        ), mock.patch.object(leda.interacting.panel, "EXECUTOR", executor):
+            mode.interact(counted_func, x=x, y=["a", "b"])
+        num_calls.append(len(calls))
+
+        # NB: Ignore IDs of models, which differ between interacts.
+        texts_by_name.append(
+            {
+                path.name: re.sub(r"p\d+", "", path.read_text())
+                for path in state_dir.rglob("*.json")
+            }
+        )
+
+    assert len(texts_by_name[1]) == num_states
+    if isinstance(x, list):
+        assert texts_by_name[0] == texts_by_name[1]
+    else:
+        # NB: Without precomputed states, panel samples float sliders
+        # itself, e.g., past their end.
+        assert texts_by_name[1].keys() <= texts_by_name[0].keys()
+    # Only the default state is computed in this process, and the others
+    # are looked up.
+    assert num_calls[0] > num_states
+    assert num_calls[1] == 1
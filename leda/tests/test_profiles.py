@@ -0,0 +1,36 @@
+import json
+import pathlib
+
+import nbformat
+
+import leda.gen.generators
+import leda.gen.profiles
+
+
+def test_profile(tmp_path: pathlib.Path) -> None:
+    nb_contents: nbformat.NotebookNode = nbformat.v4.new_notebook()
+    nb_contents.cells = [
+        nbformat.v4.new_code_cell("import time"),
+        nbformat.v4.new_markdown_cell("# Title"),
+        nbformat.v4.new_code_cell("time.sleep(0.2)\nprint('done')"),
+    ]
+
+    generator = leda.gen.generators.MainStaticReportGenerator(
+        output_dir_path=tmp_path, profile=True, profile_summary=True
+    )
+    body = generator.generate(nb_contents).decode()
+
+    with (tmp_path / leda.gen.profiles.PROFILE_FILENAME).open() as fh:
+        cells = json.load(fh)["cells"]
+    assert [cell["index"] for cell in cells] == [0, 2]
+    assert cells[1]["label"] == "time.sleep(0.2)"
+    assert cells[1]["wall_secs"] >= 0.2
+    assert cells[1]["output_bytes"] > 0
+
+    with (tmp_path / leda.gen.profiles.TRACE_FILENAME).open() as fh:
+        trace = json.load(fh)
+    assert [
+        event["name"] for event in trace["traceEvents"] if event["ph"] == "X"
+    ] == ["[0] import time", "[2] time.sleep(0.2)"]
+
+    assert "Execution profile" in body
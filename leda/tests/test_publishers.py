@@ -0,0 +1,108 @@
+import gzip
+import json
+import pathlib
+
+import pytest
+
+import leda
+
+
+def test_file_report_artifact(tmp_path: pathlib.Path) -> None:
+    src_path = tmp_path / "src.html"
+    src_path.write_bytes(b"abc" * 10)
+
+    artifact = leda.FileReportArtifact(src_path, temporary=True)
+    assert b"".join(artifact.iter_chunks(chunk_size=7)) == b"abc" * 10
+
+    dst_path = tmp_path / "index.html"
+    artifact.write_to(dst_path)
+    assert not src_path.exists()
+    assert dst_path.read_bytes() == b"abc" * 10
+
+    # No longer temporary once moved
+    artifact.cleanup()
+    assert dst_path.exists()
+
+
+def test_file_report_publisher_sidecars(tmp_path: pathlib.Path) -> None:
+    body = b"<html>" + b"hello " * 1000 + b"</html>"
+    artifact = leda.ReportArtifact(body, images={"abc.png": b"png"})
+    report = leda.FileReport(name="demo", nb_path=tmp_path / "demo.ipynb")
+
+    output_dir = tmp_path / "report"
+    (output_dir / "images").mkdir(parents=True)
+    leda.FileReportPublisher(
+        output_dir, precompress=["gzip"], hash_manifest=True
+    ).publish(report, artifact)
+
+    assert gzip.decompress((output_dir / "index.html.gz").read_bytes()) == (
+        body
+    )
+    # Already compressed
+    assert not (output_dir / "images" / "abc.png.gz").exists()
+
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    assert sorted(manifest["files"]) == [
+        "images/abc.png",
+        "index.html",
+        "index.html.gz",
+    ]
+    assert manifest["files"]["images/abc.png"]["immutable"]
+    assert not manifest["files"]["index.html"]["immutable"]
+    assert manifest["files"]["index.html"]["size"] == len(body)
+
+
+def test_s3_report_publisher(tmp_path: pathlib.Path) -> None:
+    pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+
+    local_dir = tmp_path / "report"
+    (local_dir / "images").mkdir(parents=True)
+    (local_dir / "images" / "a.png").write_bytes(b"png")
+
+    # Large enough to be uploaded in parts
+    body = b"x" * (6 * 2**20)
+    # Generators write the body to a temp file in the local dir.
+    body_path = local_dir / "tmpabc123.html"
+    body_path.write_bytes(body)
+    artifact = leda.FileReportArtifact(body_path, temporary=True)
+
+    report = leda.FileReport(name="demo", nb_path=tmp_path / "demo.ipynb")
+    with moto.mock_aws():
+        publisher = leda.S3ReportPublisher(
+            "reports",
+            prefix="daily",
+            local_dir=local_dir,
+            client_kwargs={"region_name": "us-east-1"},
+            multipart_threshold=5 * 2**20,
+            multipart_chunk_size=5 * 2**20,
+        )
+        client = publisher._get_client()
+        client.create_bucket(Bucket="reports")
+
+        url = publisher.publish(report, artifact)
+        key_prefix = f"daily/{report.full_name}"
+        assert url == f"s3://reports/{key_prefix}/index.html"
+
+        obj = client.get_object(
+            Bucket="reports", Key=f"{key_prefix}/index.html"
+        )
+        assert obj["Body"].read() == body
+        assert obj["ContentType"] == "text/html; charset=utf-8"
+        assert obj["CacheControl"] == "no-cache"
+
+        obj = client.get_object(
+            Bucket="reports", Key=f"{key_prefix}/images/a.png"
+        )
+        assert obj["Body"].read() == b"png"
+        assert obj["ContentType"] == "image/png"
+        assert "immutable" in obj["CacheControl"]
+
+        keys = [
+            obj["Key"]
+            for obj in client.list_objects_v2(Bucket="reports")["Contents"]
+        ]
+        assert sorted(keys) == [
+            f"{key_prefix}/images/a.png",
+            f"{key_prefix}/index.html",
+        ]
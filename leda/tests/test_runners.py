@@ -0,0 +1,39 @@
+import pathlib
+
+import nbformat
+
+import leda
+
+
+def test_parallel_report_set_runner(tmp_path: pathlib.Path) -> None:
+    reports: list[leda.Report] = []
+    for name, source in [
+        ("ok0", "print('hi')"),
+        ("bad", "raise ValueError('oops')"),
+        ("ok1", "print('bye')"),
+    ]:
+        nb_contents = nbformat.v4.new_notebook()
+        nb_contents.cells = [nbformat.v4.new_code_cell(source)]
+        nb_path = tmp_path / f"{name}.ipynb"
+        nbformat.write(nb_contents, nb_path)
+        reports.append(leda.FileReport(name=name, nb_path=nb_path))
+
+    runner = leda.ParallelReportSetRunner(
+        tmp_path / "outputs",
+        "static_ipywidgets",
+        jobs=2,
+        runner_options=leda.RunnerOptions(
+            publish=leda.PublishOptions(hash_manifest=True)
+        ),
+        kernel_pool_kwargs={"preload_modules": []},
+    )
+    results = runner.run(leda.ReportSet(reports))
+
+    assert [result.report.name for result in results] == ["ok0", "bad", "ok1"]
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error is not None and "oops" in results[1].error
+
+    for result, text in [(results[0], "hi"), (results[2], "bye")]:
+        assert result.url is not None
+        assert text in pathlib.Path(result.url).read_text()
+        assert (pathlib.Path(result.url).parent / "manifest.json").exists()
@@ -0,0 +1,46 @@
+import json
+import pathlib
+
+import pytest
+
+import leda.gen.sweeps
+
+
+def test_load_param_sets(tmp_path: pathlib.Path) -> None:
+    expected = [
+        {"portfolio": "abc", "window": 10},
+        {"portfolio": "def", "window": 10},
+    ]
+
+    json_path = tmp_path / "params.json"
+    json_path.write_text(
+        json.dumps({"portfolio": ["abc", "def"], "window": [10]})
+    )
+    assert leda.gen.sweeps.load_param_sets(json_path) == expected
+
+    csv_path = tmp_path / "params.csv"
+    csv_path.write_text("portfolio,window\nabc,10\ndef,10\n")
+    assert leda.gen.sweeps.load_param_sets(csv_path) == expected
+
+    pytest.importorskip("yaml")
+    yaml_path = tmp_path / "params.yaml"
+    yaml_path.write_text(
+        "- {portfolio: abc, window: 10}\n- {portfolio: def, window: 10}\n"
+    )
+    assert leda.gen.sweeps.load_param_sets(yaml_path) == expected
+
+
+def test_combine_param_sets() -> None:
+    grid = leda.gen.sweeps.parse_param_grid(["window=10,20"])
+    assert leda.gen.sweeps.combine_param_sets(
+        [{"portfolio": "abc"}, {"portfolio": "def"}], grid
+    ) == [
+        {"portfolio": "abc", "window": 10},
+        {"portfolio": "abc", "window": 20},
+        {"portfolio": "def", "window": 10},
+        {"portfolio": "def", "window": 20},
+    ]
+    assert leda.gen.sweeps.combine_param_sets(None, {}) == [{}]
+
+    with pytest.raises(ValueError):
+        leda.gen.sweeps.parse_param_grid(["window"])